@@ -1,30 +1,48 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict, List
+from datetime import datetime, timezone
 from core.env.env_utils import get_settings
+import asyncio
+import logging
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # MongoDB connection string
 MONGODB_URL = settings.MONGODB_URL
 DATABASE_NAME = settings.DATABASE_NAME
 USERS_COLLECTION = settings.USER
+CANDIDATES_COLLECTION = settings.CANDIDATES
+# candidate fields backed by an index (see ensure_candidate_indexes), the only ones exports sort on
+CANDIDATE_SORT_FIELDS = {"created_at", "match_percentage"}
 
 class DatabaseHandler:
     client: Optional[AsyncIOMotorClient] = None
+    index_task: Optional[asyncio.Task] = None
     
     @classmethod
     async def connect_db(cls):
         """Connect to MongoDB"""
         if cls.client is None:
             cls.client = AsyncIOMotorClient(MONGODB_URL)
-            print(f"Connected to MongoDB at {DATABASE_NAME}")
+            logger.info("Connected to MongoDB", extra={"database": DATABASE_NAME})
+            # building the indexes on a large collection (or an unreachable server) must not hold up startup
+            cls.index_task = asyncio.create_task(cls.ensure_candidate_indexes())
+            cls.index_task.add_done_callback(cls._log_index_failure)
+
+    @staticmethod
+    def _log_index_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Could not create the candidate indexes", exc_info=task.exception())
     
     @classmethod
     async def close_db(cls):
         """Close MongoDB connection"""
+        if cls.index_task:
+            cls.index_task.cancel()
         if cls.client:
             cls.client.close()
-            print("Closed MongoDB connection")
+            logger.info("Closed MongoDB connection")
     
     @classmethod
     def get_database(cls):
@@ -124,3 +142,152 @@ class DatabaseHandler:
         
         result = await users_collection.delete_one({"username": username})
         return result.deleted_count > 0
+
+    @classmethod
+    async def ensure_candidate_indexes(cls):
+        """
+        Create the candidate indexes; the multikey index on skills is the inverted skill -> candidate index.
+        The others cover every filter/sort combination of iter_candidates: equality on role first, then
+        the sort key, then the match_percentage range
+        """
+        candidates_collection = cls.get_database()[CANDIDATES_COLLECTION]
+        await candidates_collection.create_index("skills")
+        await candidates_collection.create_index([("role", 1), ("match_percentage", -1)])
+        await candidates_collection.create_index([("role", 1), ("created_at", -1), ("match_percentage", -1)])
+        await candidates_collection.create_index([("created_at", -1), ("match_percentage", -1)])
+        await candidates_collection.create_index("match_percentage")
+
+    @classmethod
+    async def save_candidate(cls, candidate_data: Dict) -> str:
+        """
+        Store a screened candidate
+
+        Args:
+            candidate_data: Dictionary containing the screening
+                - file_name (required)
+                - role (required)
+                - skills (required): normalized skill terms found in the resume
+                - match_percentage (required)
+                - results, summary (optional)
+
+        Returns:
+            Id of the stored candidate document
+        """
+        db = cls.get_database()
+        candidates_collection = db[CANDIDATES_COLLECTION]
+
+        candidate_data.setdefault("created_at", datetime.now(timezone.utc))
+        result = await candidates_collection.update_one(
+            {"file_name": candidate_data["file_name"], "role": candidate_data["role"]},
+            {"$set": candidate_data},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            return str(result.upserted_id)
+        existing = await candidates_collection.find_one(
+            {"file_name": candidate_data["file_name"], "role": candidate_data["role"]}, {"_id": 1}
+        )
+        return str(existing["_id"])
+
+    @classmethod
+    async def search_candidates(cls, skills: List[str], k: int = 20, role: Optional[str] = None) -> List[Dict]:
+        """
+        Rank stored candidates by how many of the given skills they have
+
+        Args:
+            skills: Normalized skill terms to look for
+            k: Number of candidates to return
+            role: Optional role the candidates were screened for
+
+        Returns:
+            Top k candidates with the matched skills, best first
+        """
+        db = cls.get_database()
+        candidates_collection = db[CANDIDATES_COLLECTION]
+
+        match = {"skills": {"$in": skills}}
+        if role:
+            match["role"] = role
+        pipeline = [
+            {"$match": match},
+            {"$project": {
+                "file_name": 1, "role": 1, "match_percentage": 1, "created_at": 1,
+                "matched_skills": {"$setIntersection": ["$skills", skills]},
+            }},
+            {"$addFields": {"score": {"$size": "$matched_skills"}}},
+            {"$sort": {"score": -1, "match_percentage": -1}},
+            {"$limit": k},
+        ]
+        candidates = await candidates_collection.aggregate(pipeline).to_list(length=k)
+        for candidate in candidates:
+            candidate["_id"] = str(candidate["_id"])
+        return candidates
+
+    @classmethod
+    async def iter_candidates(
+        cls,
+        role: Optional[str] = None,
+        min_match: Optional[float] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        limit: int = 0,
+        projection: Optional[Dict] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict]:
+        """
+        Iterate over the stored candidates in batches, without loading the result set in memory
+
+        Args:
+            role: Optional role the candidates were screened for
+            min_match: Optional minimum match percentage
+            sort: Indexed field to sort on, one of CANDIDATE_SORT_FIELDS
+            descending: Sort order
+            limit: Maximum number of candidates, 0 for all
+            projection: Optional fields to return
+            batch_size: Number of documents fetched per round trip
+        """
+        if sort not in CANDIDATE_SORT_FIELDS:
+            raise ValueError(f"{sort} should be one of the allowed in {CANDIDATE_SORT_FIELDS}")
+        db = cls.get_database()
+        candidates_collection = db[CANDIDATES_COLLECTION]
+
+        query = {}
+        if role:
+            query["role"] = role
+        if min_match is not None:
+            query["match_percentage"] = {"$gte": min_match}
+        # every role/min_match/sort combination has an index with the sort key right after the role equality
+        # (see ensure_candidate_indexes), so the server walks it in order instead of sorting in memory
+        cursor = candidates_collection.find(query, projection).sort(sort, -1 if descending else 1).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        try:
+            async for candidate in cursor:
+                candidate["_id"] = str(candidate["_id"])
+                yield candidate
+        finally:
+            # also when the client goes away in the middle of an export
+            await cursor.close()
+
+    @classmethod
+    async def iter_candidate_skills(cls, skills: List[str], batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """
+        Iterate over the stored candidates having any of the given skills, with only their identifying
+        fields and skills, using the inverted skill index
+
+        Args:
+            skills: Normalized skill terms to look for
+            batch_size: Number of documents fetched per round trip
+        """
+        db = cls.get_database()
+        candidates_collection = db[CANDIDATES_COLLECTION]
+
+        cursor = candidates_collection.find(
+            {"skills": {"$in": skills}}, {"file_name": 1, "role": 1, "skills": 1}
+        ).batch_size(batch_size)
+        try:
+            async for candidate in cursor:
+                candidate["_id"] = str(candidate["_id"])
+                yield candidate
+        finally:
+            await cursor.close()
@@ -3,6 +3,9 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, Form, FastAPI, APIRouter
 from auth.user_utils import *
 from auth.db_handler import DatabaseHandler
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/auth",
@@ -48,9 +51,9 @@ async def register_user(user_data: UserCreate):
 
 @router.post("/token")
 async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
-    print("username: " + form_data.username + " password: " + form_data.password)
     user = await authenticate_user(form_data.username, form_data.password)
     if not user:
+        logger.warning("Failed login", extra={"username": form_data.username})
         raise HTTPException(status_code=401, detail="Incorrect username or password", headers={"WWW-Authenticate": "Bearer"})
     access_token = await create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -8,9 +8,12 @@ from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 from auth.db_handler import DatabaseHandler
 import jwt
+import logging
 from core.env.env_utils import get_settings
+from core.timing import timed
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 password_hash = PasswordHash([Argon2Hasher(), BcryptHasher()])
 
@@ -52,11 +55,12 @@ def verify_password(plain_password, hashed_password):
     try:
         return password_hash.verify(plain_password, hashed_password)
     except Exception as e:
-        print(f"Verification failed: {e}")
+        logger.warning("Password verification failed", extra={"error": str(e)})
         return False
 
 async def get_user(username: str) -> Optional[User]:
-    user_dict = await DatabaseHandler.get_user(username)
+    with timed("db"):
+        user_dict = await DatabaseHandler.get_user(username)
     if user_dict:
         return User(**user_dict)
     return None
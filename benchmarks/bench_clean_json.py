@@ -0,0 +1,74 @@
+"""
+Compare the previous clean_json_response with the current single-pass parser on a corpus of
+malformed model outputs (benchmarks/llm_outputs.jsonl), plus a long garbage input that made the
+previous raw_decode loop quadratic.
+
+    python -m benchmarks.bench_clean_json
+"""
+import contextlib
+import io
+import json
+import re
+import time
+from pathlib import Path
+
+from ollama_extractor import clean_json_response
+
+CORPUS_FILE = Path(__file__).parent / "llm_outputs.jsonl"
+
+
+def legacy_clean_json_response(response_text):
+    cleaned = re.sub(r'```json\s*', '', response_text)
+    cleaned = re.sub(r'\s*```', '', cleaned)
+    json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
+    if json_match:
+        cleaned = json_match.group(0)
+    cleaned = cleaned.replace('0.5,', '')
+    cleaned = cleaned.strip()
+    decoder = json.JSONDecoder()
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        cleaned = re.sub(r',\s*}', '}', cleaned)
+        cleaned = re.sub(r',\s*]', ']', cleaned)
+        try:
+            return json.loads(cleaned)
+        except json.JSONDecodeError:
+            for match in re.finditer(r'\{', cleaned):
+                start = match.start()
+                try:
+                    obj, _ = decoder.raw_decode(cleaned[start:])
+                    return obj
+                except json.JSONDecodeError:
+                    continue
+            return response_text
+
+
+def run(parser, corpus, repeat):
+    correct = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            for row in corpus:
+                result = parser(row["output"])
+                if row["expected"] is None:
+                    correct += isinstance(result, str)
+                else:
+                    correct += result == row["expected"]
+    elapsed = time.perf_counter() - start
+    return correct / (len(corpus) * repeat), elapsed / (len(corpus) * repeat)
+
+
+def main(repeat: int = 200):
+    corpus = [json.loads(line) for line in CORPUS_FILE.read_text().splitlines() if line.strip()]
+    garbage = [{"output": "{ not json " * 2000, "expected": None}]
+
+    print(f"{'parser':<10} {'success':>8} {'us/call':>10} {'garbage ms/call':>16}")
+    for name, parser in (("legacy", legacy_clean_json_response), ("current", clean_json_response)):
+        success, per_call = run(parser, corpus, repeat)
+        _, garbage_per_call = run(parser, garbage, 3)
+        print(f"{name:<10} {success:>8.0%} {per_call * 1e6:>10.1f} {garbage_per_call * 1e3:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Near-duplicate lookup time against a large fingerprint index: LSH buckets in SQLite
+versus comparing the signature with every stored one.
+
+    python -m benchmarks.bench_fingerprints --fingerprints 100000 --queries 200
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from hrmcpserver.fingerprints import NUM_PERMUTATIONS, FingerprintIndex
+
+
+def percentile(latencies, fraction):
+    latencies = sorted(latencies)
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate fingerprint lookup benchmark")
+    parser.add_argument("--fingerprints", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    signatures = rng.integers(0, 2 ** 31 - 1, (args.fingerprints, NUM_PERMUTATIONS), dtype=np.uint32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = FingerprintIndex(Path(directory) / "fingerprints.sqlite3")
+        start = time.perf_counter()
+        for batch in range(0, len(signatures), 10000):
+            index.add_many(list(signatures[batch:batch + 10000]))
+        print(f"indexed {index.count()} fingerprints in {time.perf_counter() - start:.1f}s")
+
+        # near-duplicates: a stored signature with ~5% of its minimums changed; misses: fresh signatures
+        near_duplicates = []
+        for row in rng.integers(0, len(signatures), args.queries):
+            query = signatures[row].copy()
+            changed = rng.random(NUM_PERMUTATIONS) < 0.05
+            query[changed] = rng.integers(0, 2 ** 31 - 1, changed.sum(), dtype=np.uint32)
+            near_duplicates.append(query)
+        misses = list(rng.integers(0, 2 ** 31 - 1, (args.queries, NUM_PERMUTATIONS), dtype=np.uint32))
+
+        for label, queries in (("near-duplicate", near_duplicates), ("new resume", misses)):
+            latencies = []
+            found = 0
+            for query in queries:
+                start = time.perf_counter()
+                found += index.find_duplicate(query, args.threshold) is not None
+                latencies.append(time.perf_counter() - start)
+            print(f"lsh    {label:15} p50 {percentile(latencies, 0.5):7.3f} ms  p95 {percentile(latencies, 0.95):7.3f} ms  found {found}/{len(queries)}")
+
+        latencies = []
+        for query in near_duplicates[:20]:
+            start = time.perf_counter()
+            (signatures == query).mean(axis=1).max()
+            latencies.append(time.perf_counter() - start)
+        print(f"linear {'near-duplicate':15} p50 {percentile(latencies, 0.5):7.3f} ms  p95 {percentile(latencies, 0.95):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-request overhead of the timing middleware on the /test route: no middleware, the previous
+BaseHTTPMiddleware implementation, and the pure ASGI TimingMiddleware.
+
+    python -m benchmarks.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from middleware import TimingMiddleware
+
+
+class BaseHTTPTimingMiddleware(BaseHTTPMiddleware):
+    # the replaced implementation, kept here for comparison
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/test")
+    async def read_root():
+        return {"message": "i am alive"}
+
+    if middleware:
+        app.add_middleware(middleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):
+            await client.get("/test")
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/test")
+        return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timing middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    baseline = asyncio.run(measure(build_app(), args.requests))
+    print(f"{'no middleware':24} {baseline * 1e6:8.1f} us/request")
+    for label, middleware in (("BaseHTTPMiddleware", BaseHTTPTimingMiddleware), ("pure ASGI (Server-Timing)", TimingMiddleware)):
+        per_request = asyncio.run(measure(build_app(middleware), args.requests))
+        print(f"{label:24} {per_request * 1e6:8.1f} us/request  (+{(per_request - baseline) * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-image latency and throughput of the OCR backends on many small images:
+pytesseract (a `tesseract` process per image) versus pooled in-process tesserocr engines.
+
+    python -m benchmarks.bench_ocr_backends --images 200 --workers 4
+"""
+import argparse
+import importlib.util
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from hrmcpserver.ocr import TesseractPool, ocr_image, prepare_image_for_ocr
+
+
+def small_images(count: int):
+    font = ImageFont.load_default(size=24)
+    images = []
+    for index in range(count):
+        image = Image.new("L", (420, 60), 255)
+        ImageDraw.Draw(image).text((8, 14), f"Candidate {index}: Angular, RxJS", fill=0, font=font)
+        images.append(prepare_image_for_ocr(image))
+    return images
+
+
+def run(backend, images, workers, languages):
+    pool = TesseractPool(workers) if backend == "tesserocr" else None
+
+    def recognize(image):
+        start = time.perf_counter()
+        if pool:
+            pool.image_to_string(image, languages)
+        else:
+            ocr_image(image, languages, backend="pytesseract")
+        return time.perf_counter() - start
+
+    # first call loads the language data, keep it out of the steady-state numbers
+    recognize(images[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = sorted(executor.map(recognize, images))
+    elapsed = time.perf_counter() - start
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], len(images) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR backend benchmark")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--languages", default="eng")
+    args = parser.parse_args()
+
+    backends = []
+    if shutil.which("tesseract") and importlib.util.find_spec("pytesseract"):
+        backends.append("pytesseract")
+    if importlib.util.find_spec("tesserocr"):
+        backends.append("tesserocr")
+    if not backends:
+        print("Neither pytesseract (with the tesseract binary) nor tesserocr is installed")
+        return
+
+    images = small_images(args.images)
+    print(f"{'backend':<12} {'p50 ms':>8} {'p95 ms':>8} {'images/s':>9}")
+    for backend in backends:
+        p50, p95, throughput = run(backend, images, args.workers, args.languages)
+        print(f"{backend:<12} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {throughput:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
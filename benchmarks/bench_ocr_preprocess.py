@@ -0,0 +1,103 @@
+"""
+Compare the previous OCR preprocessing (fixed 2x LANCZOS upscale, median filter, fixed threshold
+at 160) with hrmcpserver.ocr.prepare_image_for_ocr on a synthetic corpus of resume snippets:
+small/large fonts, uneven lighting, noise and slight skew.
+
+Reports time per image, peak traced memory (tracemalloc sees NumPy buffers but not Pillow's
+internal images, so the output size in megapixels is shown as well) and, when Tesseract is
+installed, character accuracy.
+
+    python -m benchmarks.bench_ocr_preprocess
+"""
+import difflib
+import random
+import shutil
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+
+from hrmcpserver.ocr import prepare_image_for_ocr
+
+WORDS = (
+    "angular typescript rxjs ngrx flutter dart firebase docker kubernetes python fastapi "
+    "senior developer 2019 2024 team lead agile scrum code review rest graphql html5 css3"
+).split()
+
+
+def legacy_prepare_image_for_ocr(image):
+    img = image.convert("L")
+    if min(img.size) < 1500:
+        img = img.resize((img.width * 2, img.height * 2), Image.LANCZOS)
+    img = ImageOps.autocontrast(img)
+    img = img.filter(ImageFilter.MedianFilter(size=3))
+    return img.point(lambda x: 255 if x > 160 else 0, mode="1")
+
+
+def synthetic_corpus(count: int = 24, seed: int = 7):
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    corpus = []
+    for index in range(count):
+        font_size = rng.choice([11, 14, 18, 28])
+        lines = [" ".join(rng.choice(WORDS) for _ in range(6)) for _ in range(8)]
+        font = ImageFont.load_default(size=font_size)
+        width, line_height = font_size * 30, int(font_size * 1.8)
+        image = Image.new("L", (width, line_height * len(lines) + 20), 235)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines):
+            draw.text((10, 10 + row * line_height), line, fill=rng.randint(20, 90), font=font)
+
+        pixels = np.asarray(image, dtype=np.float32)
+        if index % 3 == 1:
+            # uneven lighting, darker towards the right
+            pixels *= np.linspace(1.0, 0.55, pixels.shape[1])[None, :]
+        if index % 3 == 2:
+            pixels += np_rng.normal(0, 18, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        if index % 4 == 3:
+            image = image.rotate(rng.uniform(-2, 2), fillcolor=235, expand=True)
+        corpus.append((image, "\n".join(lines)))
+    return corpus
+
+
+def measure(pipeline, corpus, ocr):
+    elapsed, peak, pixels, accuracy = 0.0, 0, 0, []
+    for image, truth in corpus:
+        tracemalloc.start()
+        start = time.perf_counter()
+        processed = pipeline(image)
+        elapsed += time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        pixels += processed.width * processed.height
+        if ocr:
+            text = ocr(processed)
+            accuracy.append(difflib.SequenceMatcher(None, " ".join(text.split()), " ".join(truth.split())).ratio())
+    return elapsed / len(corpus), peak, pixels / len(corpus), (sum(accuracy) / len(accuracy) if accuracy else None)
+
+
+def main():
+    corpus = synthetic_corpus()
+    ocr = None
+    if shutil.which("tesseract"):
+        import pytesseract
+        ocr = lambda img: pytesseract.image_to_string(img, lang="eng", config="--psm 6 --oem 3")
+    else:
+        print("tesseract not found, skipping accuracy")
+
+    print(f"{'pipeline':<10} {'ms/image':>9} {'peak MiB':>9} {'out MPx':>8} {'char acc':>9}")
+    for name, pipeline in (
+        ("legacy", legacy_prepare_image_for_ocr),
+        ("otsu", prepare_image_for_ocr),
+        ("adaptive", lambda img: prepare_image_for_ocr(img, threshold="adaptive")),
+        ("deskew", lambda img: prepare_image_for_ocr(img, deskew=True)),
+    ):
+        per_image, peak, pixels, accuracy = measure(pipeline, corpus, ocr)
+        accuracy_text = f"{accuracy:.1%}" if accuracy is not None else "-"
+        print(f"{name:<10} {per_image * 1000:>9.1f} {peak / 2**20:>9.1f} {pixels / 1e6:>8.2f} {accuracy_text:>9}")
+
+
+if __name__ == "__main__":
+    main()
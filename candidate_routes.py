@@ -0,0 +1,198 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+import csv
+import heapq
+import io
+import json
+import time
+
+from auth.db_handler import CANDIDATE_SORT_FIELDS, DatabaseHandler
+from core.timing import timed
+from hrmcpserver import hrserver, skill_matcher
+from middleware import auth_middleware
+
+
+router = APIRouter(
+    prefix="/candidates",
+    tags=["candidates"],
+    dependencies=[Depends(auth_middleware)],
+)
+
+# upper bound of k for search and rescore
+MAX_K = 500
+
+
+class RescoreRequest(BaseModel):
+    role: str
+    k: int = Field(20, ge=1, le=MAX_K)
+
+
+@router.get("/search")
+async def search_candidates(skills: str = Query(..., description="Comma separated skills, e.g. kubernetes,go"), k: int = Query(20, ge=1, le=MAX_K), role: str = None):
+    """
+    Find the stored candidates having most of the given skills, using the inverted skill index.
+    """
+    terms = [skill_matcher.normalize_skill(skill) for skill in skills.split(",")]
+    terms = [term for term in dict.fromkeys(terms) if term]
+    if not terms:
+        raise HTTPException(status_code=400, detail="No skills given")
+
+    start = time.perf_counter()
+    with timed("db"):
+        candidates = await DatabaseHandler.search_candidates(terms, k, role.lower() if role else None)
+    return {
+        "skills": terms,
+        "candidates": candidates,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+@router.post("/rescore")
+async def rescore_candidates(request: RescoreRequest):
+    """
+    Score the stored candidates against a role from hrskills.json using their stored skills,
+    without the LLM or the original resume files, and return the top k. Only the candidates
+    having at least one of the role terms are read, through the inverted skill index; the
+    others would score 0.
+    """
+    role_skills = next((x["skills"] for x in hrserver.load_hr_skills() if x["role"].lower() == request.role.lower()), None)
+    if not role_skills:
+        raise HTTPException(status_code=404, detail=f"No skills found for the role: {request.role}")
+
+    start = time.perf_counter()
+    role_index = skill_matcher.role_term_index(role_skills)
+    role_terms = sorted({term for _, _, terms in role_index for term in terms})
+    # bounded min-heap so memory stays at k entries regardless of the pool size
+    top = []
+    scored = 0
+    with timed("db"):
+        async for candidate in DatabaseHandler.iter_candidate_skills(role_terms):
+            _, match_percentage = skill_matcher.score_terms(role_index, set(candidate.get("skills", [])))
+            entry = (match_percentage, candidate["_id"], candidate)
+            if len(top) < request.k:
+                heapq.heappush(top, entry)
+            elif match_percentage > top[0][0]:
+                heapq.heapreplace(top, entry)
+            scored += 1
+    top.sort(key=lambda item: item[0], reverse=True)
+
+    candidates = []
+    for _, _, candidate in top:
+        results, match_percentage = skill_matcher.score_terms(role_index, set(candidate.get("skills", [])))
+        candidates.append({
+            "_id": candidate["_id"],
+            "file_name": candidate.get("file_name"),
+            "screened_for": candidate.get("role"),
+            "match_percentage": match_percentage,
+            "results": results,
+        })
+    return {
+        "role": request.role,
+        "scored": scored,
+        "candidates": candidates,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+EXPORT_CATEGORIES = ("technical_skills", "soft_skills", "certifications")
+EXPORT_COLUMNS = (
+    ["id", "file_name", "role", "match_percentage"]
+    + [f"{kind}_{category}" for kind in ("matched", "missing") for category in EXPORT_CATEGORIES]
+    + ["skills", "duplicate_of", "created_at"]
+)
+# rows serialized per chunk of the response
+EXPORT_CHUNK_ROWS = 500
+
+
+def _csv_cell(value):
+    # file names come from uploads, keep spreadsheets from evaluating them as formulas
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def _csv_row(candidate: dict) -> list:
+    results = candidate.get("results") or {}
+    created_at = candidate.get("created_at")
+    row = [candidate["_id"], candidate.get("file_name"), candidate.get("role"), candidate.get("match_percentage")]
+    for kind in ("matched_skills", "missing_skills"):
+        row += ["; ".join(results.get(category, {}).get(kind, [])) for category in EXPORT_CATEGORIES]
+    row += [
+        "; ".join(candidate.get("skills", [])),
+        candidate.get("duplicate_of") or "",
+        created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    ]
+    return [_csv_cell(value) for value in row]
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+async def _export_rows(candidates: AsyncIterator[dict], export_format: str) -> AsyncIterator[str]:
+    """
+    Serialize the candidates as they come off the cursor, EXPORT_CHUNK_ROWS per chunk, and close it
+    when done or abandoned.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    try:
+        async for candidate in candidates:
+            if export_format == "csv":
+                writer.writerow(_csv_row(candidate))
+            else:
+                buffer.write(json.dumps(candidate, default=_json_default) + "\n")
+            rows += 1
+            if rows % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # a disconnected client only closes this generator, close the database cursor with it
+        await candidates.aclose()
+
+
+@router.get("/export")
+async def export_candidates(
+    format: str = "csv",
+    role: Optional[str] = None,
+    min_match: Optional[float] = Query(None, ge=0, le=100, description="Minimum match percentage"),
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: int = Query(0, ge=0, description="Maximum number of candidates, 0 for all"),
+):
+    """
+    Stream the stored screenings as CSV (one row per candidate) or NDJSON (the full documents),
+    read from the database in batches so memory stays flat whatever the number of candidates.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format should be one of {sorted(EXPORT_FORMATS)}")
+    if sort not in CANDIDATE_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort should be one of {sorted(CANDIDATE_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order should be asc or desc")
+
+    candidates = DatabaseHandler.iter_candidates(
+        role=role.lower() if role else None,
+        min_match=min_match,
+        sort=sort,
+        descending=order == "desc",
+        limit=limit,
+        # the CSV only needs these fields, the NDJSON export keeps every stored field
+        projection={"skills": 1, "results": 1, "file_name": 1, "role": 1, "match_percentage": 1, "duplicate_of": 1, "created_at": 1} if format == "csv" else None,
+        batch_size=EXPORT_CHUNK_ROWS,
+    )
+    file_name = f"candidates-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        _export_rows(candidates, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
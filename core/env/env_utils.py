@@ -11,9 +11,63 @@ class Settings(BaseSettings):
     MONGODB_URL: str
     DATABASE_NAME:str = None
     USER: str = None
+    CANDIDATES: str = 'candidates'
     SECRET_KEY: str
     ALGORITHM: str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # keep the chat model (and its prompt cache) loaded between requests
+    OLLAMA_KEEP_ALIVE: str = '30m'
+    # resume screening budget, 0 means unlimited
+    RESUME_MAX_PAGES: int = 5
+    RESUME_MAX_CHARS: int = 20000
+    # LLM skill extraction prompt budget and parallel chunk requests
+    PROMPT_MAX_TOKENS: int = 1536
+    EXTRACTION_CONCURRENCY: int = 4
+    # when to call the LLM after the local skill matcher: off, fallback (nothing matched) or enrich (always)
+    SKILL_LLM_MODE: str = 'fallback'
+    # embedding based skill matching, combined with the fuzzy matcher; off by default, it adds an
+    # embedding call for up to SEMANTIC_MAX_PHRASES phrases to every screening, bounded by EMBEDDING_TIMEOUT seconds
+    SEMANTIC_MATCHING: bool = False
+    EMBEDDING_MODEL: str = 'nomic-embed-text'
+    SEMANTIC_MATCH_THRESHOLD: float = 0.75
+    SEMANTIC_MAX_PHRASES: int = 200
+    EMBEDDING_TIMEOUT: float = 5.0
+    # OCR preprocessing: otsu or adaptive thresholding, optional deskew
+    OCR_THRESHOLD: str = 'otsu'
+    OCR_DESKEW: bool = False
+    # pytesseract (subprocess per image) or tesserocr (pooled in-process engines)
+    OCR_BACKEND: str = 'pytesseract'
+    OCR_POOL_SIZE: int = 4
+    # tesseract languages to choose from, narrowed per image by script detection
+    OCR_LANGUAGES: list[str] = ['eng', 'ara']
+    OCR_SCRIPT_DETECTION: bool = True
+    OCR_SCRIPT_MIN_CONFIDENCE: float = 1.0
+    # per-user cache of chat answers, expiring by the tools used (calendar answers sooner)
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_TTL: int = 600
+    RESPONSE_CACHE_CALENDAR_TTL: int = 60
+    RESPONSE_CACHE_SIMILARITY: float = 0.95
+    # MinHash near-duplicate detection, duplicates reuse the earlier screening
+    DUPLICATE_DETECTION: bool = True
+    DUPLICATE_THRESHOLD: float = 0.85
+    # bulk ingestion caps (uncompressed sizes) and extraction workers
+    INGEST_MAX_ENTRIES: int = 500
+    INGEST_MAX_TOTAL_MB: int = 200
+    INGEST_MAX_FILE_MB: int = 10
+    INGEST_WORKERS: int = 4
+    # minimum seconds between two incremental Google Calendar syncs
+    CALENDAR_SYNC_INTERVAL: int = 30
+    # sampling profiler: admins request it per request (X-Profile: 1 or ?profile=1), a rate > 0 also profiles random requests
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: int = 5
+    PROFILE_DIR: str = 'profiles'
+    # structured logging: level, json or text lines, share of the high-volume (sampled) records kept
+    LOG_LEVEL: str = 'INFO'
+    LOG_FORMAT: str = 'json'
+    LOG_SAMPLE_RATE: float = 1.0
+    # gzip for dynamic responses (JSON, NDJSON) of at least GZIP_MIN_SIZE bytes
+    GZIP_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
 
 
     model_config = SettingsConfigDict(
@@ -28,6 +82,41 @@ class Settings(BaseSettings):
             raise ValueError(f"{v} should be one of the allowed in {allowed}")
         return v
     
+    @field_validator("SKILL_LLM_MODE")
+    def validate_skill_llm_mode(cls, v):
+        allowed = {"off", "fallback", "enrich"}
+        if v not in allowed:
+            raise ValueError(f"{v} should be one of the allowed in {allowed}")
+        return v
+
+    @field_validator("OCR_BACKEND")
+    def validate_ocr_backend(cls, v):
+        allowed = {"pytesseract", "tesserocr"}
+        if v not in allowed:
+            raise ValueError(f"{v} should be one of the allowed in {allowed}")
+        return v
+
+    @field_validator("LOG_LEVEL")
+    def validate_log_level(cls, v):
+        allowed = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+        if v not in allowed:
+            raise ValueError(f"{v} should be one of the allowed in {allowed}")
+        return v
+
+    @field_validator("LOG_FORMAT")
+    def validate_log_format(cls, v):
+        allowed = {"json", "text"}
+        if v not in allowed:
+            raise ValueError(f"{v} should be one of the allowed in {allowed}")
+        return v
+
+    @field_validator("OCR_THRESHOLD")
+    def validate_ocr_threshold(cls, v):
+        allowed = {"otsu", "adaptive"}
+        if v not in allowed:
+            raise ValueError(f"{v} should be one of the allowed in {allowed}")
+        return v
+
     @property
     def is_production(self) -> bool:
         return self.ENV=="prod"
@@ -0,0 +1,58 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def profile_imports(module: str) -> list[dict]:
+    """
+    Import the given module in a fresh interpreter with `-X importtime` and collect the timings.
+
+    Args:
+        module: Dotted module name to import (e.g. "main" or "index_routes")
+
+    Returns:
+        A list of {"module", "self_ms", "cumulative_ms"} entries in import order.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            # nested imports keep their indentation so the tree can be reconstructed
+            "module": name[1:].rstrip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return entries
+
+
+def print_report(module: str, top: int = 25):
+    entries = profile_imports(module)
+    # top level imports are the ones without leading indentation in the importtime tree
+    total_ms = sum(e["cumulative_ms"] for e in entries if not e["module"].startswith(" "))
+    print(f"Importing {module} took {total_ms:.1f} ms ({len(entries)} modules)")
+    print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+    for entry in sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]:
+        print(f"{entry['cumulative_ms']:>14.1f} {entry['self_ms']:>10.1f}  {entry['module'].strip()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time profile report")
+    parser.add_argument("module", nargs="?", default="main", help="Module to profile")
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest imports to show")
+    args = parser.parse_args()
+    print_report(args.module, args.top)
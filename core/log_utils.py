@@ -0,0 +1,170 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.env.env_utils import get_settings
+
+"""
+ structured logging: records are put on an in-memory queue by the calling thread and written by
+ a background QueueListener, so a log call never blocks on stdout/stderr. every record carries the
+ correlation id of the request it was logged for, keyword fields given with `extra=` are emitted
+ as JSON fields, secrets are redacted, and records marked `extra={"sampled": True}` are kept at
+ LOG_SAMPLE_RATE.
+
+    logger = logging.getLogger(__name__)
+    logger.info("Tool called", extra={"tool": name, "sampled": True})
+"""
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+REDACTED = "***"
+_SECRET_KEYS = re.compile(r"pass(word|wd)?|secret|token|authorization|api[_-]?key|credential", re.IGNORECASE)
+_SECRET_VALUES = re.compile(r"(?i)(bearer\s+|(?:password|secret|token|api[_-]?key)\s*[=:]\s*)[^\s,;\"']+")
+
+# attributes of every LogRecord, anything else on a record came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id", "sampled"}
+
+
+def redact(value):
+    """
+    Mask secret-looking keys and values (passwords, tokens, API keys) in a log field.
+    """
+    if isinstance(value, dict):
+        return {key: REDACTED if _SECRET_KEYS.search(str(key)) else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return _SECRET_VALUES.sub(lambda match: match.group(1) + REDACTED, value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = REDACTED if _SECRET_KEYS.search(key) else redact(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        line = redact(super().format(record))
+        return f"{line} {json.dumps(redact(fields), default=str)}" if fields else line
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the calling thread: attaches the request id and drops the sampled-out records.
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class _FieldPreservingQueueHandler(logging.handlers.QueueHandler):
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the default prepare formats the record with the queue handler's formatter; only merge the
+        # message arguments and leave the formatting to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_text = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route every logger through the queue to a background writer; safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    settings = get_settings()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _FieldPreservingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter(settings.LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Write the records still on the queue and stop the background writer; safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving every request a correlation id (the `X-Request-ID` header when sent),
+    available to all log records of the request and returned in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = next((value.decode() for name, value in scope.get("headers", []) if name == b"x-request-id"), None)
+        request_id = (request_id or uuid.uuid4().hex)[:64]
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
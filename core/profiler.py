@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+from core.env.env_utils import get_settings
+
+"""
+ on-demand request profiling. a sampling profiler snapshots the Python stacks of every thread
+ (the event loop and the worker threads running OCR/extraction/Mongo calls) at a fixed interval
+ and writes them in the folded format read by flamegraph.pl and speedscope.
+
+ a request is profiled when an admin sends `X-Profile: 1` or `?profile=1`, or at random with
+ PROFILE_SAMPLE_RATE; anything else goes straight through the middleware.
+"""
+
+logger = logging.getLogger(__name__)
+
+# leaf functions of a thread waiting for work, left out of the worker-thread samples
+_IDLE_FUNCTIONS = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"), ("thread.py", "_worker")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval: float = 0.005, main_thread_id: Optional[int] = None):
+        self.interval = interval
+        self.main_thread_id = main_thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def _is_idle(self, frame) -> bool:
+        return (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in _IDLE_FUNCTIONS
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if thread_id != self.main_thread_id and self._is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            root = "main" if thread_id == self.main_thread_id else names.get(thread_id, f"thread-{thread_id}")
+            self.samples[";".join([root] + stack[::-1])] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def folded(self) -> str:
+        """
+        Return the samples as folded stacks ("frame;frame;frame count" per line).
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded())
+        return path
+
+
+# one profile at a time: the sampler sees every thread, overlapping profiles would double count
+_active_lock = threading.Lock()
+
+
+def _wants_profile(scope) -> bool:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("profile", [""])[-1] in ("1", "true"):
+        return True
+    return any(name == b"x-profile" and value in (b"1", b"true") for name, value in scope.get("headers", []))
+
+
+async def _is_admin(scope) -> bool:
+    from auth.user_utils import get_current_active_user, get_current_user
+
+    token = next((value.decode() for name, value in scope.get("headers", []) if name == b"authorization"), "")
+    if token.lower().startswith("bearer "):
+        token = token[7:]
+    if not token:
+        return False
+    try:
+        user = await get_current_active_user(await get_current_user(token))
+    except Exception:
+        return False
+    return user.role == "admin"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling admin-requested (and randomly sampled) requests into PROFILE_DIR.
+    The profile file is named in the `X-Profile-File` response header of admin-requested profiles only.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.interval = settings.PROFILE_INTERVAL_MS / 1000
+        self.directory = Path(settings.PROFILE_DIR)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = _wants_profile(scope)
+        sampled = not requested and self.sample_rate > 0 and random.random() < self.sample_rate
+        if not requested and not sampled:
+            return await self.app(scope, receive, send)
+        if requested and not await _is_admin(scope):
+            return await self.app(scope, receive, send)
+        if not _active_lock.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        route = scope["path"].strip("/").replace("/", "_") or "root"
+        path = self.directory / f"{stamp}-{route}{'-sampled' if sampled else ''}.folded"
+        profiler = SamplingProfiler(self.interval)
+        finished = False
+
+        def stop_and_save():
+            try:
+                profiler.stop()
+            finally:
+                _active_lock.release()
+            profiler.save(path)
+
+        async def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                # joining the sampler thread and writing the file would block the event loop
+                await asyncio.to_thread(stop_and_save)
+                logger.info("Request profiled", extra={"path": scope["path"], "duration_ms": round(profiler.duration * 1000), "samples": profiler.sample_count, "profile": str(path)})
+
+        async def send_wrapper(message):
+            # sampled requests may come from anyone, do not tell them about server paths
+            if message["type"] == "http.response.start" and requested:
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-file", str(path).encode())]
+            await send(message)
+            # streaming responses are profiled until their last chunk
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await finish()
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await finish()
@@ -0,0 +1,181 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+"""
+ static frontend served from a build directory prepared at startup: scripts and stylesheets get a
+ content-hashed copy (style.3f9a0c2e1b.css) referenced from index.html and cached for a year as
+ immutable, index.html and the unhashed names are revalidated with a content ETag (304 when
+ unchanged). text files are precompressed with gzip, and brotli when the package is installed,
+ and the smallest variant the client accepts is sent.
+"""
+
+logger = logging.getLogger(__name__)
+
+BUILD_DIR = Path(__file__).parent.parent / ".cache" / "static"
+
+HASHED_SUFFIXES = {".css", ".js"}
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".map"}
+# below this size the encoding overhead outweighs the savings
+MIN_COMPRESS_SIZE = 256
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_ASSET_REFERENCE = re.compile(r'((?:href|src)=")([^"?#]+)(")')
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _brotli_compress(data: bytes) -> Optional[bytes]:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+_TEMP_SUFFIX = ".tmp"
+
+
+def _write(path: Path, data: bytes):
+    # unchanged files keep their mtime (and Last-Modified)
+    if not path.exists() or path.read_bytes() != data:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # every worker builds at startup: write a private temporary file and rename it over the
+        # target, so neither a concurrent build nor a request ever sees a half-written file
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}{_TEMP_SUFFIX}")
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+
+class StaticBuild:
+    """
+    Files written to the build directory: relative name -> {encoding or "identity": (etag, stat)}.
+    """
+
+    def __init__(self, build_dir: Path):
+        self.build_dir = build_dir
+        self.variants: dict[str, dict[str, tuple[str, os.stat_result]]] = {}
+        self.hashed: set[str] = set()
+
+    def add(self, name: str, data: bytes, hashed: bool = False):
+        digest = _content_hash(data)
+        _write(self.build_dir / name, data)
+        variants = {"identity": (f'"{digest}"', os.stat(self.build_dir / name))}
+        if Path(name).suffix in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_SIZE:
+            compressed = {"gzip": gzip.compress(data, compresslevel=9, mtime=0), "br": _brotli_compress(data)}
+            for encoding, suffix in _ENCODINGS:
+                body = compressed[encoding]
+                if body is not None and len(body) < len(data):
+                    _write(self.build_dir / (name + suffix), body)
+                    variants[encoding] = (f'"{digest}-{encoding}"', os.stat(self.build_dir / (name + suffix)))
+        self.variants[name] = variants
+        if hashed:
+            self.hashed.add(name)
+
+    def remove_stale(self):
+        expected = {name + suffix for name, variants in self.variants.items() for suffix in [""] + [s for e, s in _ENCODINGS if e in variants]}
+        for path in self.build_dir.rglob("*"):
+            if path.name.endswith(_TEMP_SUFFIX) or not path.is_file():
+                # in-progress writes of another worker
+                continue
+            if path.relative_to(self.build_dir).as_posix() not in expected:
+                path.unlink(missing_ok=True)
+
+
+def build_static(source_dir: Path, build_dir: Path = BUILD_DIR) -> StaticBuild:
+    """
+    Copy source_dir into build_dir with hashed script/stylesheet names rewritten into the HTML
+    files, and their precompressed variants.
+    """
+    source_dir, build = Path(source_dir), StaticBuild(Path(build_dir))
+    files = sorted(path for path in source_dir.rglob("*") if path.is_file())
+    renamed = {}
+    for path in files:
+        if path.suffix == ".html":
+            continue
+        name = path.relative_to(source_dir).as_posix()
+        data = path.read_bytes()
+        build.add(name, data)
+        if path.suffix in HASHED_SUFFIXES:
+            hashed_name = f"{name[:-len(path.suffix)]}.{_content_hash(data)}{path.suffix}"
+            build.add(hashed_name, data, hashed=True)
+            renamed[name] = hashed_name
+
+    def hashed_reference(match: re.Match) -> str:
+        return match.group(1) + renamed.get(match.group(2).removeprefix("./"), match.group(2)) + match.group(3)
+
+    for path in files:
+        if path.suffix == ".html":
+            name = path.relative_to(source_dir).as_posix()
+            build.add(name, _ASSET_REFERENCE.sub(hashed_reference, path.read_text()).encode())
+    build.remove_stale()
+    logger.info("Static files built", extra={"source": str(source_dir), "files": len(files), "hashed": len(renamed)})
+    return build
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles over the build of `source_dir`, picking the precompressed variant the client accepts.
+    """
+
+    def __init__(self, source_dir: str, build_dir: Path = BUILD_DIR, html: bool = True):
+        self.build = build_static(Path(source_dir), build_dir)
+        super().__init__(directory=build_dir, html=html)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        name = Path(os.path.relpath(full_path, os.path.realpath(self.build.build_dir))).as_posix()
+        variants = self.build.variants.get(name)
+        if variants is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        encoding = next((encoding for encoding, _ in _ENCODINGS if encoding in accepted and encoding in variants), None)
+        etag, variant_stat = variants[encoding or "identity"]
+        headers = {
+            "etag": etag,
+            "cache-control": IMMUTABLE if name in self.build.hashed else REVALIDATE,
+        }
+        if len(variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+        if encoding:
+            headers["content-encoding"] = encoding
+        path = os.path.join(self.build.build_dir, name + dict(_ENCODINGS)[encoding]) if encoding else full_path
+        # the media type comes from the original name, not the .gz/.br one
+        response = FileResponse(path, status_code=status_code, headers=headers, media_type=mimetypes.guess_type(name)[0], stat_result=variant_stat)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
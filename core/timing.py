@@ -0,0 +1,64 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+"""
+ request-scoped stage timings for the Server-Timing header. the timing middleware starts a
+ collector per request; code on the request path (auth, LLM rounds, tools, DB) wraps its work in
+ `timed("stage")`. outside of a request, or without the middleware, timing is a no-op.
+"""
+
+_stages: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("request_stages", default=None)
+
+
+def start_request() -> contextvars.Token:
+    return _stages.set([])
+
+
+def end_request(token: contextvars.Token):
+    _stages.reset(token)
+
+
+def record_stage(name: str, duration: float):
+    """
+    Add a stage duration (seconds) to the current request, if one is being timed.
+    """
+    stages = _stages.get()
+    if stages is not None:
+        stages.append((name, duration))
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Time the enclosed block as a stage of the current request (works around awaits and in to_thread calls).
+    """
+    if _stages.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def server_timing(total: Optional[float] = None) -> str:
+    """
+    Format the stages of the current request as a Server-Timing header value; repeated stages are summed.
+    """
+    totals: dict[str, list] = {}
+    for name, duration in _stages.get() or []:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += duration
+        entry[1] += 1
+    metrics = []
+    for name, (duration, count) in totals.items():
+        metric = f"{name};dur={duration * 1000:.1f}"
+        if count > 1:
+            metric += f';desc="{count} calls"'
+        metrics.append(metric)
+    if total is not None:
+        metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
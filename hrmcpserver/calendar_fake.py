@@ -0,0 +1,136 @@
+import datetime
+import itertools
+import threading
+from typing import Optional
+
+"""
+ in-memory stand-in for the Google Calendar events API (service.events().list/insert/patch/delete
+ with .execute()), including sync tokens, deleted events returned as "cancelled", pagination and
+ token expiry (HTTP 410), so the incremental calendar sync can be exercised offline:
+
+    service = FakeCalendarService()
+    store = CalendarEventStore("primary", lambda: service, cache_dir=None)
+"""
+
+
+class FakeResponse:
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Gone" if status == 410 else "Error"
+
+
+class FakeHttpError(Exception):
+    """
+    Mirrors googleapiclient.errors.HttpError closely enough for callers checking `error.resp.status`.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.resp = FakeResponse(status)
+        self.status_code = status
+
+
+class _Request:
+
+    def __init__(self, function, **kwargs):
+        self._function = function
+        self._kwargs = kwargs
+
+    def execute(self):
+        return self._function(**self._kwargs)
+
+
+class FakeCalendarService:
+
+    def __init__(self, page_size: int = 250):
+        self.page_size = page_size
+        # calendar id -> event id -> (version, event)
+        self._calendars: dict[str, dict[str, tuple[int, dict]]] = {}
+        self._version = itertools.count(1)
+        self._current_version = 0
+        self._expired_before = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.list_calls: list[dict] = []
+
+    def events(self):
+        return self
+
+    def _store(self, calendar_id: str, event: dict):
+        version = next(self._version)
+        self._current_version = version
+        self._calendars.setdefault(calendar_id, {})[event["id"]] = (version, event)
+
+    def insert(self, calendarId: str, body: dict, **kwargs) -> _Request:
+        def insert_event():
+            with self._lock:
+                event = dict(body, id=body.get("id") or f"event{next(self._ids)}", status="confirmed")
+                event["htmlLink"] = f"https://calendar.example/{event['id']}"
+                self._store(calendarId, event)
+                return dict(event)
+        return _Request(insert_event)
+
+    def patch(self, calendarId: str, eventId: str, body: dict, **kwargs) -> _Request:
+        def patch_event():
+            with self._lock:
+                _, event = self._calendars[calendarId][eventId]
+                event = dict(event, **body)
+                self._store(calendarId, event)
+                return dict(event)
+        return _Request(patch_event)
+
+    def delete(self, calendarId: str, eventId: str, **kwargs) -> _Request:
+        def delete_event():
+            with self._lock:
+                if eventId not in self._calendars.get(calendarId, {}):
+                    raise FakeHttpError(404, "Not Found")
+                # deleted events stay visible to incremental syncs as "cancelled"
+                self._store(calendarId, {"id": eventId, "status": "cancelled"})
+        return _Request(delete_event)
+
+    def expire_sync_tokens(self):
+        """
+        Invalidate every sync token handed out so far, like Google does after a while.
+        """
+        with self._lock:
+            self._expired_before = self._current_version + 1
+
+    def list(self, calendarId: str, syncToken: Optional[str] = None, pageToken: Optional[str] = None,
+             timeMin: Optional[str] = None, timeMax: Optional[str] = None, **kwargs) -> _Request:
+        def list_events():
+            with self._lock:
+                self.list_calls.append({"calendarId": calendarId, "syncToken": syncToken, "pageToken": pageToken})
+                since = 0
+                if syncToken is not None:
+                    since = int(syncToken.removeprefix("sync-"))
+                    if since < self._expired_before:
+                        raise FakeHttpError(410, "Sync token is no longer valid, a full sync is required.")
+                items = [
+                    (version, event) for version, event in self._calendars.get(calendarId, {}).values()
+                    # a full sync leaves out deleted events
+                    if version > since and (syncToken is not None or event.get("status") != "cancelled")
+                ]
+                items.sort(key=lambda item: item[0])
+                if syncToken is None and (timeMin or timeMax):
+                    items = [item for item in items if _overlaps(item[1], timeMin, timeMax)]
+                offset = int(pageToken or 0)
+                page = items[offset:offset + self.page_size]
+                response = {"items": [dict(event) for _, event in page]}
+                if offset + self.page_size < len(items):
+                    response["nextPageToken"] = str(offset + self.page_size)
+                else:
+                    response["nextSyncToken"] = f"sync-{self._current_version}"
+                return response
+        return _Request(list_events)
+
+
+def _parse(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _overlaps(event: dict, time_min: Optional[str], time_max: Optional[str]) -> bool:
+    start, end = event.get("start", {}).get("dateTime"), event.get("end", {}).get("dateTime")
+    if not start or not end:
+        return True
+    return (not time_max or _parse(start) < _parse(time_max)) and (not time_min or _parse(end) > _parse(time_min))
@@ -1,12 +1,16 @@
 import datetime
+import logging
 import os.path
+import threading
 from pathlib import Path
+from typing import Optional
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from hrmcpserver.calendar_store import WORK_END_HOUR, WORK_START_HOUR, CalendarEventStore, free_slots
+from core.env.env_utils import get_settings
+
+# The Google API client stack is slow to import, so it is loaded inside the methods that use it.
+
+logger = logging.getLogger(__name__)
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
@@ -17,6 +21,11 @@ CREDENTIALS_FILE = PROJECT_ROOT / "google_service.json"  # OAuth client secrets
 TOKEN_FILE = PROJECT_ROOT / "token.json"  # Stored user credentials
 
 class CalendarService:
+  _credentials = None
+  # httplib2 (under the API client) is not thread-safe: one client per thread, built from shared credentials
+  _local = threading.local()
+  _event_stores: dict = {}
+  _lock = threading.Lock()
 
   @staticmethod
   def _get_credentials():
@@ -26,15 +35,19 @@ class CalendarService:
     Returns:
         Credentials object or dict with error if authentication fails
     """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds = None
     
     # Load credentials from token file
     if TOKEN_FILE.exists():
       try:
         creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
-        print(f"Loaded credentials from {TOKEN_FILE}")
+        logger.debug("Loaded credentials", extra={"path": str(TOKEN_FILE)})
       except Exception as e:
-        print(f"Error loading token file: {e}")
+        logger.warning("Error loading token file", extra={"error": str(e)})
         creds = None
     
     # If there are no (valid) credentials available, let the user log in.
@@ -42,9 +55,9 @@ class CalendarService:
       if creds and creds.expired and creds.refresh_token:
         try:
           creds.refresh(Request())
-          print("Refreshed expired credentials")
+          logger.info("Refreshed expired credentials")
         except Exception as e:
-          print(f"Error refreshing credentials: {e}")
+          logger.warning("Error refreshing credentials", extra={"error": str(e)})
           creds = None
       
       if not creds:
@@ -59,7 +72,7 @@ class CalendarService:
               str(CREDENTIALS_FILE), SCOPES
           )
           creds = flow.run_local_server(port=0)
-          print("Completed OAuth flow")
+          logger.info("Completed OAuth flow")
         except Exception as e:
           return {
             "error": f"OAuth authentication failed: {str(e)}",
@@ -69,11 +82,43 @@ class CalendarService:
       # Save the credentials for the next run
       with open(TOKEN_FILE, "w") as token:
         token.write(creds.to_json())
-        print(f"Saved credentials to {TOKEN_FILE}")
+        logger.info("Saved credentials", extra={"path": str(TOKEN_FILE)})
     
     return creds
 
 
+  @classmethod
+  def _get_service(cls):
+    """
+    Return the Calendar API client of the calling thread (FastAPI's threadpool, asyncio.to_thread and the
+    fast path all call in from different threads); raises RuntimeError when authentication fails.
+    """
+    from googleapiclient.discovery import build
+
+    service = getattr(cls._local, "service", None)
+    if service is None:
+      with cls._lock:
+        if cls._credentials is None:
+          creds = cls._get_credentials()
+          if isinstance(creds, dict) and "error" in creds:
+            raise RuntimeError(creds["error"])
+          cls._credentials = creds
+      service = build("calendar", "v3", credentials=cls._credentials, cache_discovery=False)
+      cls._local.service = service
+    return service
+
+  @classmethod
+  def event_store(cls, calendar_id: str = "primary", service_factory=None) -> CalendarEventStore:
+    """
+    Return the incrementally synced local event store of a calendar.
+    """
+    with cls._lock:
+      store = cls._event_stores.get(calendar_id)
+      if store is None:
+        store = CalendarEventStore(calendar_id, service_factory or cls._get_service, get_settings().CALENDAR_SYNC_INTERVAL)
+        cls._event_stores[calendar_id] = store
+      return store
+
   @staticmethod
   def schedule_interview_on_google(to_email: str, start_time: str, end_time: str, candidate_name: str = None, role: str = None) -> dict:
     """
@@ -89,16 +134,14 @@ class CalendarService:
     Returns:
         dict: Event creation result with event link or error
     """
-    # Get credentials
-    creds = CalendarService._get_credentials()
-    
-    # Check if authentication failed
-    if isinstance(creds, dict) and "error" in creds:
-      return creds
-    
+    from googleapiclient.errors import HttpError
+
+    try:
+      service = CalendarService._get_service()
+    except RuntimeError as e:
+      return {"error": str(e), "success": False}
+
     try:
-      service = build("calendar", "v3", credentials=creds)
-      
       # Build event summary
       summary = "Interview"
       if candidate_name and role:
@@ -152,6 +195,8 @@ class CalendarService:
         conferenceDataVersion=1,
         sendUpdates='all'  # Send email notifications to attendees
       ).execute()
+      # the new event blocks the slot right away, the next incremental sync confirms it
+      CalendarService.event_store('primary').upsert(event_result)
       
       return {
         "success": True,
@@ -177,138 +222,62 @@ class CalendarService:
       }
 
   @staticmethod
-  def get_free_time_from_google(interviewer: str) -> dict:
+  def get_free_time_from_google(interviewer: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
     """
     Get free time slots from Google Calendar for the given interviewer.
+    Availability is computed from the local event store, which only fetches the events changed since the last sync.
     
     Args:
         interviewer: Name of the interviewer
+        start_date: First day to check (YYYY-MM-DD), defaults to the Monday of the current week
+        end_date: Last day to check (YYYY-MM-DD), defaults to the Sunday after start_date
         
     Returns:
         dict: Calendar events and free time information
     """
-    # Get credentials
-    creds = CalendarService._get_credentials()
-    
-    # Check if authentication failed
-    if isinstance(creds, dict) and "error" in creds:
-      return creds
-
     try:
-      service = build("calendar", "v3", credentials=creds)
-      
-      # Get current week boundaries (Monday to Sunday)
       now = datetime.datetime.now(tz=datetime.timezone.utc)
-      # Find Monday of current week
-      start_of_week = now - datetime.timedelta(days=now.weekday())
-      start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-      # Find Sunday of current week
-      end_of_week = start_of_week + datetime.timedelta(days=6, hours=23, minutes=59, seconds=59)
-      
-      # Fetch all events for the current week
-      events_result = (
-          service.events()
-          .list(
-              calendarId="primary",
-              timeMin=start_of_week.isoformat(),
-              timeMax=end_of_week.isoformat(),
-              singleEvents=True,
-              orderBy="startTime",
-          )
-          .execute()
-      )
-      events = events_result.get("items", [])
-      
-      # Define working hours (9 AM to 5 PM)
-      work_start_hour = 9
-      work_end_hour = 17
-      
-      # Calculate available time slots
-      available_slots = []
-      
-      # Process each day of the week
-      for day_offset in range(7):
-        current_day = start_of_week + datetime.timedelta(days=day_offset)
-        
-        # Skip weekends (Saturday=5, Sunday=6)
-        if current_day.weekday() >= 5:
-          continue
-        
-        # Skip past days
-        if current_day.date() < now.date():
-          continue
-        
-        # Set working hours for this day
-        day_start = current_day.replace(hour=work_start_hour, minute=0, second=0, microsecond=0)
-        day_end = current_day.replace(hour=work_end_hour, minute=0, second=0, microsecond=0)
-        
-        # Get events for this specific day
-        day_events = []
-        for event in events:
-          event_start_str = event["start"].get("dateTime", event["start"].get("date"))
-          event_end_str = event["end"].get("dateTime", event["end"].get("date"))
-          
-          # Parse datetime
-          if "T" in event_start_str:
-            event_start = datetime.datetime.fromisoformat(event_start_str.replace("Z", "+00:00"))
-            event_end = datetime.datetime.fromisoformat(event_end_str.replace("Z", "+00:00"))
-          else:
-            # All-day event
-            continue
-          
-          # Check if event is on this day
-          if event_start.date() == current_day.date():
-            day_events.append({
-              "start": event_start,
-              "end": event_end,
-              "summary": event.get("summary", "Busy")
-            })
-        
-        # Sort events by start time
-        day_events.sort(key=lambda x: x["start"])
-        
-        # Find gaps between events
-        current_time = day_start
-        
-        for event in day_events:
-          # If there's a gap before this event
-          if current_time < event["start"]:
-            # Add available slot
-            available_slots.append({
-              "start": current_time.isoformat(),
-              "end": event["start"].isoformat(),
-              "duration_minutes": int((event["start"] - current_time).total_seconds() / 60),
-              "day": current_day.strftime("%A, %Y-%m-%d")
-            })
-          # Move current time to end of this event
-          current_time = max(current_time, event["end"])
-        
-        # Check if there's time left at the end of the day
-        if current_time < day_end:
-          available_slots.append({
-            "start": current_time.isoformat(),
-            "end": day_end.isoformat(),
-            "duration_minutes": int((day_end - current_time).total_seconds() / 60),
-            "day": current_day.strftime("%A, %Y-%m-%d")
-          })
-      
+      today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+      if start_date:
+        range_start = datetime.datetime.fromisoformat(start_date).replace(tzinfo=datetime.timezone.utc)
+      else:
+        # Monday of the current week
+        range_start = today - datetime.timedelta(days=now.weekday())
+      if end_date:
+        range_end = datetime.datetime.fromisoformat(end_date).replace(tzinfo=datetime.timezone.utc) + datetime.timedelta(days=1)
+      else:
+        range_end = range_start + datetime.timedelta(days=7 - range_start.weekday())
+      if range_end <= range_start:
+        return {"error": "end_date must not be before start_date", "interviewer": interviewer}
+
+      store = CalendarService.event_store("primary")
+      store.sync()
+      # past days are not offered
+      slots_start = max(range_start, today)
+      available_slots = free_slots(store.busy_intervals(slots_start, range_end), slots_start, range_end) if slots_start < range_end else []
+
       return {
         "interviewer": interviewer,
-        "week_start": start_of_week.strftime("%Y-%m-%d"),
-        "week_end": end_of_week.strftime("%Y-%m-%d"),
+        "week_start": range_start.strftime("%Y-%m-%d"),
+        "week_end": (range_end - datetime.timedelta(days=1)).strftime("%Y-%m-%d"),
         "available_slots": available_slots,
         "total_slots": len(available_slots),
-        "working_hours": f"{work_start_hour}:00 - {work_end_hour}:00"
+        "working_hours": f"{WORK_START_HOUR}:00 - {WORK_END_HOUR}:00"
       }
 
-    except HttpError as error:
+    except RuntimeError as error:
       return {
-        "error": f"Google Calendar API error: {str(error)}",
+        "error": str(error),
         "interviewer": interviewer
       }
     except Exception as e:
+      # HttpError (the API client is only imported when the service is built)
+      if getattr(e, "resp", None) is not None:
+        return {
+          "error": f"Google Calendar API error: {str(e)}",
+          "interviewer": interviewer
+        }
       return {
         "error": f"Unexpected error: {str(e)}",
         "interviewer": interviewer
       }
-  
\ No newline at end of file
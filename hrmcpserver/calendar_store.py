@@ -0,0 +1,178 @@
+import bisect
+import datetime
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+"""
+ local copy of a Google Calendar kept current with incremental sync: the first sync lists every
+ event and keeps the returned nextSyncToken, later syncs only fetch the events changed since.
+ an expired token (HTTP 410 Gone) falls back to a full resync. availability is computed from the
+ local copy for any date range, and the store is saved to disk so a restart stays incremental.
+"""
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+WORK_START_HOUR = 9
+WORK_END_HOUR = 17
+
+
+def _parse_time(value: dict) -> Optional[datetime.datetime]:
+    # all-day events only have a "date" and do not block working hours
+    if not value or "dateTime" not in value:
+        return None
+    return datetime.datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+
+
+def _is_gone(error: Exception) -> bool:
+    resp = getattr(error, "resp", None)
+    return getattr(resp, "status", None) in (410, "410")
+
+
+class CalendarEventStore:
+
+    def __init__(self, calendar_id: str, service_factory: Callable, min_sync_interval: float = 30.0, cache_dir: Optional[Path] = CACHE_DIR):
+        self.calendar_id = calendar_id
+        self.service_factory = service_factory
+        self.min_sync_interval = min_sync_interval
+        self.cache_file = cache_dir / f"calendar_{re.sub(r'[^a-zA-Z0-9_.@-]', '_', calendar_id)}.json" if cache_dir else None
+        self.sync_token: Optional[str] = None
+        self.last_sync = 0.0
+        self._events: dict[str, dict] = {}
+        # (start, end, event id) of the timed events, sorted by start; rebuilt after changes
+        self._intervals: Optional[list] = None
+        self._lock = threading.RLock()
+        self._metrics = {"full_syncs": 0, "incremental_syncs": 0, "changed_events": 0}
+        self._load()
+
+    def _load(self):
+        if self.cache_file and self.cache_file.exists():
+            try:
+                state = json.loads(self.cache_file.read_text())
+                self.sync_token = state.get("sync_token")
+                self._events = state.get("events", {})
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring the calendar cache", extra={"path": str(self.cache_file), "error": str(e)})
+
+    def _save(self):
+        if self.cache_file:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps({"sync_token": self.sync_token, "events": self._events}))
+
+    def _apply(self, event: dict):
+        if event.get("status") == "cancelled":
+            self._events.pop(event["id"], None)
+        else:
+            self._events[event["id"]] = {key: event.get(key) for key in ("id", "summary", "start", "end", "status")}
+        self._intervals = None
+
+    def upsert(self, event: dict):
+        """
+        Apply an event created or changed through the API right away, without waiting for the next sync.
+        """
+        with self._lock:
+            self._apply(event)
+
+    def _list(self, service, **params) -> Optional[str]:
+        """
+        Page through events().list, applying every returned event; returns the next sync token.
+        """
+        page_token = None
+        while True:
+            response = service.events().list(calendarId=self.calendar_id, singleEvents=True, pageToken=page_token, **params).execute()
+            for event in response.get("items", []):
+                self._apply(event)
+                self._metrics["changed_events"] += 1
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return response.get("nextSyncToken")
+
+    def sync(self, force: bool = False):
+        """
+        Bring the local copy up to date; skipped when the last sync is more recent than min_sync_interval.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self.last_sync < self.min_sync_interval:
+                return
+            service = self.service_factory()
+            if self.sync_token:
+                try:
+                    self.sync_token = self._list(service, syncToken=self.sync_token)
+                    self._metrics["incremental_syncs"] += 1
+                except Exception as e:
+                    if not _is_gone(e):
+                        raise
+                    logger.info("Sync token expired, running a full sync", extra={"calendar_id": self.calendar_id})
+                    self.sync_token = None
+            if not self.sync_token:
+                self._events = {}
+                self._intervals = None
+                self.sync_token = self._list(service)
+                self._metrics["full_syncs"] += 1
+            self.last_sync = time.monotonic()
+            self._save()
+
+    def busy_intervals(self, start: datetime.datetime, end: datetime.datetime) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Return the (start, end) of the timed events overlapping [start, end), sorted by start.
+        """
+        with self._lock:
+            if self._intervals is None:
+                intervals = []
+                for event in self._events.values():
+                    event_start, event_end = _parse_time(event.get("start")), _parse_time(event.get("end"))
+                    if event_start and event_end:
+                        intervals.append((event_start, event_end, event["id"]))
+                intervals.sort()
+                self._intervals = intervals
+            intervals = self._intervals
+        upper = bisect.bisect_left(intervals, (end,))
+        return [(event_start, event_end) for event_start, event_end, _ in intervals[:upper] if event_end > start]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {**self._metrics, "events": len(self._events), "has_sync_token": bool(self.sync_token)}
+
+
+def free_slots(
+    busy: list[tuple[datetime.datetime, datetime.datetime]],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    work_start_hour: int = WORK_START_HOUR,
+    work_end_hour: int = WORK_END_HOUR,
+) -> list[dict]:
+    """
+    Gaps between the busy intervals within the working hours of the weekdays in [start, end).
+    """
+    slots = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if day.weekday() < 5:
+            day_start = max(day.replace(hour=work_start_hour), start)
+            day_end = min(day.replace(hour=work_end_hour), end)
+            current = day_start
+            for busy_start, busy_end in busy:
+                if busy_end <= current or busy_start >= day_end:
+                    continue
+                if current < busy_start:
+                    slots.append(_slot(current, busy_start))
+                current = max(current, busy_end)
+            if current < day_end:
+                slots.append(_slot(current, day_end))
+        day += datetime.timedelta(days=1)
+    return slots
+
+
+def _slot(start: datetime.datetime, end: datetime.datetime) -> dict:
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "duration_minutes": int((end - start).total_seconds() / 60),
+        "day": start.strftime("%A, %Y-%m-%d"),
+    }
@@ -0,0 +1,91 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+"""
+ server-side store for extracted resume texts. tools hand the model a short handle
+ (e.g. "doc_3f9a1c2b7e") instead of the full text, and resolve the handle when it comes back.
+"""
+
+HANDLE_PATTERN = re.compile(r"^doc_[0-9a-f]{10}$")
+PREVIEW_CHARS = 300
+
+
+class DocumentStore:
+
+    def __init__(self, max_documents: int = 256):
+        self.max_documents = max_documents
+        self._documents: OrderedDict = OrderedDict()
+        self._handles_by_file: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def put(self, text: str, file_name: Optional[str] = None) -> str:
+        """
+        Store an extracted text and return its handle. The same text always gets the same handle.
+        """
+        handle = f"doc_{hashlib.sha1(text.encode()).hexdigest()[:10]}"
+        with self._lock:
+            document = self._documents.get(handle) or {"handle": handle, "text": text, "created_at": time.time()}
+            if file_name:
+                document["file_name"] = file_name
+                self._handles_by_file[file_name] = handle
+            self._documents[handle] = document
+            self._documents.move_to_end(handle)
+            while len(self._documents) > self.max_documents:
+                _, evicted = self._documents.popitem(last=False)
+                if self._handles_by_file.get(evicted.get("file_name")) == evicted["handle"]:
+                    del self._handles_by_file[evicted["file_name"]]
+        return handle
+
+    def annotate(self, handle: str, **fields):
+        """
+        Attach metadata (e.g. the near-duplicate fingerprint) to a stored document.
+        """
+        with self._lock:
+            document = self._documents.get(handle)
+            if document is not None:
+                document.update(fields)
+
+    def get(self, handle: str) -> Optional[dict]:
+        with self._lock:
+            return self._documents.get(handle)
+
+    def find_by_file(self, file_name: str) -> Optional[dict]:
+        with self._lock:
+            handle = self._handles_by_file.get(file_name)
+            return self._documents.get(handle) if handle else None
+
+    def resolve(self, resume: str) -> Optional[str]:
+        """
+        Return the stored text when given a handle, otherwise the argument itself (plain resume text).
+        Returns None for a handle that is not in the store (evicted, or issued by another worker).
+        """
+        if HANDLE_PATTERN.match(resume.strip()):
+            document = self.get(resume.strip())
+            return document["text"] if document else None
+        return resume
+
+    def summary(self, handle: str) -> Optional[dict]:
+        """
+        Compact description of a stored document, returned to the model instead of the full text.
+        """
+        document = self.get(handle)
+        if not document:
+            return None
+        text = document["text"]
+        summary = {
+            "handle": handle,
+            "file_name": document.get("file_name"),
+            "chars": len(text),
+            "lines": text.count("\n") + 1 if text else 0,
+            "preview": text[:PREVIEW_CHARS],
+        }
+        if document.get("duplicate_of"):
+            summary["duplicate_of"] = document["duplicate_of"]
+        return summary
+
+
+document_store = DocumentStore()
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+"""
+ near-duplicate resume detection: a MinHash signature of the word shingles of the extracted text,
+ indexed with LSH (banded signature buckets) in a local SQLite file. a resume whose signature
+ lands in a bucket of a known one is compared on the full signature, and a near-duplicate reuses
+ the screenings stored for the first version instead of running the matcher/LLM again.
+"""
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+DEFAULT_INDEX_PATH = CACHE_DIR / "fingerprints.sqlite3"
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+# texts with fewer shingles (failed OCR returns "") would all share the same signature
+MIN_SHINGLES = 10
+# 16 bands of 8 rows: documents with a Jaccard similarity above ~0.7 share a bucket with high probability
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_PATTERN = re.compile(r"\w+")
+
+_permutations = None
+
+
+def _permutation_parameters():
+    import numpy as np
+
+    global _permutations
+    if _permutations is None:
+        # fixed seed: signatures are persisted and must stay comparable across restarts
+        rng = np.random.default_rng(20240917)
+        _permutations = (
+            rng.integers(1, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64),
+            rng.integers(0, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64),
+        )
+    return _permutations
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """
+    Return the set of lower-cased word n-grams of the text (the whole text for very short ones).
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def has_enough_text(text: str) -> bool:
+    """
+    Whether the text has enough shingles for its signature to tell it apart from other texts.
+    """
+    return len(shingles(text)) >= MIN_SHINGLES
+
+
+def minhash(text: str) -> "np.ndarray":
+    """
+    MinHash signature of the text: for every permutation, the minimum hash over its shingles.
+    """
+    import numpy as np
+
+    a, b = _permutation_parameters()
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) & _MERSENNE_PRIME for shingle in shingles(text)),
+        dtype=np.uint64,
+    )
+    if not len(hashes):
+        return np.full(NUM_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint32)
+    permuted = (hashes[:, None] * a + b) % _MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature: "np.ndarray", other: "np.ndarray") -> float:
+    """
+    Estimated Jaccard similarity of the shingle sets behind two signatures.
+    """
+    return float((signature == other).mean())
+
+
+def band_keys(signature: "np.ndarray") -> list[int]:
+    """
+    LSH bucket of every band, as a signed 63-bit integer usable as an SQLite key.
+    """
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).digest(), "big") >> 1
+        for band in range(BANDS)
+    ]
+
+
+class FingerprintIndex:
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    id INTEGER PRIMARY KEY,
+                    file_name TEXT,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    fingerprint_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+                CREATE TABLE IF NOT EXISTS screenings (
+                    fingerprint_id INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    skills_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (fingerprint_id, role, skills_version)
+                );
+            """)
+            self._connection = connection
+        return self._connection
+
+    def add(self, signature: "np.ndarray", file_name: Optional[str] = None) -> int:
+        return self.add_many([signature], [file_name])[0]
+
+    def add_many(self, signatures: list, file_names: Optional[list] = None) -> list[int]:
+        """
+        Index signatures in a single transaction and return their fingerprint ids.
+        """
+        file_names = file_names or [None] * len(signatures)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                ids = []
+                bands = []
+                for signature, file_name in zip(signatures, file_names):
+                    fingerprint_id = connection.execute(
+                        "INSERT INTO fingerprints (file_name, signature, created_at) VALUES (?, ?, ?)",
+                        (file_name, signature.tobytes(), now),
+                    ).lastrowid
+                    ids.append(fingerprint_id)
+                    bands.extend((band, bucket, fingerprint_id) for band, bucket in enumerate(band_keys(signature)))
+                connection.executemany("INSERT INTO bands (band, bucket, fingerprint_id) VALUES (?, ?, ?)", bands)
+            return ids
+
+    def find_duplicate(self, signature: "np.ndarray", threshold: float) -> Optional[dict]:
+        """
+        Return the most similar stored fingerprint sharing an LSH bucket with the signature,
+        if its estimated similarity reaches the threshold.
+        """
+        import numpy as np
+
+        clauses = " OR ".join(["(band = ? AND bucket = ?)"] * BANDS)
+        parameters = [value for band, bucket in enumerate(band_keys(signature)) for value in (band, bucket)]
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id, file_name, signature FROM fingerprints WHERE id IN (SELECT fingerprint_id FROM bands WHERE {clauses})",
+                parameters,
+            ).fetchall()
+        best = None
+        for fingerprint_id, file_name, stored in rows:
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= threshold and (best is None or score > best["similarity"]):
+                best = {"id": fingerprint_id, "file_name": file_name, "similarity": round(score, 4)}
+        return best
+
+    def lookup(self, signature: "np.ndarray", threshold: float, file_name: Optional[str] = None) -> tuple[int, Optional[dict]]:
+        """
+        Return the fingerprint id to use for the text and the near-duplicate it matched (None for a new text,
+        which is added to the index).
+        """
+        duplicate = self.find_duplicate(signature, threshold)
+        if duplicate is not None:
+            return duplicate["id"], duplicate
+        return self.add(signature, file_name), None
+
+    def get_screening(self, fingerprint_id: int, role: str, skills_version: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT result FROM screenings WHERE fingerprint_id = ? AND role = ? AND skills_version = ?",
+                (fingerprint_id, role.lower(), skills_version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_screening(self, fingerprint_id: int, role: str, skills_version: str, result: dict):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO screenings (fingerprint_id, role, skills_version, result) VALUES (?, ?, ?, ?)",
+                    (fingerprint_id, role.lower(), skills_version, json.dumps(result)),
+                )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+
+_index: Optional[FingerprintIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex()
+        return _index
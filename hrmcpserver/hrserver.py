@@ -5,89 +5,162 @@ from pathlib import Path
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from mcp.server.fastmcp import FastMCP
 from hrmcpserver.prompts import Prompt
 from hrmcpserver.calendar_service import CalendarService
-import uvicorn
-from rapidfuzz import fuzz
-from fastapi import FastAPI
+from hrmcpserver import fingerprints, semantic_matcher, skill_matcher
+from hrmcpserver.ocr import extract_text_from_image
+from hrmcpserver.document_store import document_store
 import argparse
+import contextvars
+import importlib
 import json
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-from typing import List, Optional
-
+import logging
+import mmap
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 
 from ollama_extractor import OllamaExtractor
-mcp = FastMCP("hr", stateless_http=True)
+from core.env.env_utils import get_settings
 
 """
  this will be the hr server that will include to tools for HR management]
     - tools: candidate screening, interview scheduling.
+
+ heavy dependencies (PyMuPDF, Tesseract, PIL, RapidFuzz, FastMCP, Google API client)
+ are imported on first use so that importing this module stays cheap for the API workers.
+ call `warm_up()` to load them ahead of the first request.
 """
 
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = [
+    "fitz",
+    "pytesseract",
+    "PIL.Image",
+    "rapidfuzz.fuzz",
+    "numpy",
+    "mcp.server.fastmcp",
+    "googleapiclient.discovery",
+    "google_auth_oauthlib.flow",
+]
+
+def warm_up() -> dict:
+    """
+    Import the heavy dependencies so the first request does not pay for them.
+
+    Returns:
+        A dictionary of module name to import time in milliseconds (None if the module is unavailable).
+    """
+    timings = {}
+    for module_name in HEAVY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+            timings[module_name] = round((time.perf_counter() - start) * 1000, 2)
+        except ImportError as exc:
+            logger.warning("Warm-up could not import module", extra={"module_name": module_name, "error": str(exc)})
+            timings[module_name] = None
+    return timings
+
 skills_file = Path(__file__).parent / "hrskills.json"
 
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+MMAP_THRESHOLD = 1024 * 1024
+
 def __load_hr_skills():
     with open(skills_file, "r") as f:
         skills_data = json.load(f)
     return skills_data
 
-def __extract_text_from_pdf(resume_path: Path) -> str:
-    doc_stream = fitz.open(resume_path)
-    text = ""
-    for page in doc_stream:
-        text += page.get_text()
-    return text
+def load_hr_skills() -> list[dict]:
+    """
+    Return the role definitions from hrskills.json.
+    """
+    return __load_hr_skills()
 
-def _prepare_image_for_ocr(image: Image.Image) -> Image.Image:
+# a hyphen at a line break followed by a word character is a split word, any other whitespace run is collapsed
+_NORMALIZE_PATTERN = re.compile(r"(?<=\w)-[ \t]*\n\s*(?=\w)|\s+")
+
+def _normalize_match(match: re.Match) -> str:
+    matched = match.group(0)
+    if matched[0] == "-":
+        return ""
+    return "\n" if "\n" in matched else " "
+
+def normalize_text(text: str) -> str:
     """
-    Apply preprocessing steps to boost OCR accuracy, especially for numbers.
+    De-hyphenate words split across lines and collapse whitespace in a single pass,
+    keeping one newline where the original had line breaks.
     """
-    img = image.convert("L")  # grayscale
-
-    # Upscale small images to improve recognition of fine details
-    min_dimension = min(img.size)
-    if min_dimension < 1500:
-        scale_factor = 2
-        img = img.resize(
-            (img.width * scale_factor, img.height * scale_factor),
-            Image.LANCZOS,
-        )
-
-    # Enhance contrast and reduce noise
-    img = ImageOps.autocontrast(img)
-    img = img.filter(ImageFilter.MedianFilter(size=3))
-
-    # Binarize (threshold) to help distinguish characters
-    img = img.point(lambda x: 255 if x > 160 else 0, mode="1")
-    return img
-
-
-def extract_text_from_image(
-    image_path: str,
-    languages: str = "eng+ara",
-    whitelist: Optional[str] = None,
-) -> str:
+    return _NORMALIZE_PATTERN.sub(_normalize_match, text).strip()
+
+def _iter_pdf_pages(doc, max_pages: int, max_chars: int):
     """
-    Extract text from an image (PNG/JPG) using Tesseract OCR.
+    Yield normalized page texts, stopping once the page or character budget is spent.
+    A budget of 0 means unlimited.
     """
-    try:
-        with Image.open(image_path) as img:
-            processed_img = _prepare_image_for_ocr(img)
-            config = "--psm 6 --oem 3"
-            if whitelist:
-                config += f' -c tessedit_char_whitelist="{whitelist}"'
-            text = pytesseract.image_to_string(
-                processed_img,
-                lang=languages,
-                config=config,
-            )
-            return text.strip()
-    except Exception as exc:
-        print(f"Error extracting text from image {image_path}: {exc}")
-        return ""
+    last_page = doc.page_count if not max_pages else min(max_pages, doc.page_count)
+    remaining = max_chars
+    for page in doc.pages(0, last_page):
+        page_text = normalize_text(page.get_text())
+        if max_chars:
+            page_text = page_text[:remaining]
+            remaining -= len(page_text)
+        if page_text:
+            yield page_text
+        if max_chars and remaining <= 0:
+            return
+
+def __extract_text_from_pdf(resume: Union[Path, bytes, memoryview], max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    import fitz  # PyMuPDF
+
+    settings = get_settings()
+    max_pages = settings.RESUME_MAX_PAGES if max_pages is None else max_pages
+    max_chars = settings.RESUME_MAX_CHARS if max_chars is None else max_chars
+    # PyMuPDF reads bytes/memoryview streams in place, without copying them
+    doc = fitz.open(resume) if isinstance(resume, (str, Path)) else fitz.open(stream=resume, filetype="pdf")
+    with doc:
+        return "\n".join(_iter_pdf_pages(doc, max_pages, max_chars))
+
+def extract_text_from_bytes(data: Union[bytes, memoryview], file_name: str) -> str:
+    """
+    Extract text from an in-memory resume (e.g. an upload buffer or a memory-mapped file).
+
+    Args:
+        data: The file content
+        file_name: Original file name, used to pick the PDF or image extractor
+
+    Raises:
+        ValueError: if the file type is not supported
+    """
+    lower_name = file_name.lower()
+    if lower_name.endswith(".pdf"):
+        return __extract_text_from_pdf(data)
+    elif lower_name.endswith(IMAGE_EXTENSIONS):
+        # PIL reads from a file object; unlike bytes, any other buffer is copied into the BytesIO,
+        # so do that once here (images are small, large ones on disk are opened by path)
+        return extract_text_from_image(data if isinstance(data, bytes) else bytes(data), file_name=file_name).strip()
+    raise ValueError("Unsupported file type. Supported: PDF, PNG, JPG, JPEG")
+
+def __extract_text_from_path(full_path: Path) -> str:
+    lower_name = full_path.name.lower()
+    if lower_name.endswith(IMAGE_EXTENSIONS):
+        # PIL reads the file itself
+        return extract_text_from_image(full_path).strip()
+    # large PDFs are memory-mapped instead of read into a private copy
+    if full_path.stat().st_size < MMAP_THRESHOLD:
+        if lower_name.endswith(".pdf"):
+            return __extract_text_from_pdf(full_path)
+        return extract_text_from_bytes(full_path.read_bytes(), full_path.name)
+
+    with open(full_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            return extract_text_from_bytes(view, full_path.name)
+        finally:
+            view.release()
 
 def parse_skills_text(text: str) -> list[str]:
     """
@@ -99,29 +172,74 @@ def parse_skills_text(text: str) -> list[str]:
     skills = [line.strip().lstrip('- ').strip() for line in text.split('\n') if line.strip()]
     return skills
 
-def __preprocess_resume(role: str, resume_text: str, role_skills: dict) -> list[str]:
-    prompt_text = Prompt.prompt_resume_preprocess(role, resume_text, role_skills)
+def __preprocess_resume(role: str, resume_text: str, role_skills: dict) -> tuple[list[str], dict]:
+    """
+    Extract the candidate skills with the LLM, chunking the resume so each prompt stays within
+    PROMPT_MAX_TOKENS. Chunks are extracted concurrently and their skill lists merged.
+
+    Returns:
+        The skill list (or the raw failed response) and the prompt/latency metrics.
+    """
+    settings = get_settings()
+    skill_list = Prompt.compact_skillset(role_skills)
+    overhead = Prompt.estimate_tokens(Prompt.prompt_resume_preprocess(role, "", skill_list))
+    chunks = Prompt.chunk_resume(resume_text, max(settings.PROMPT_MAX_TOKENS - overhead, 256))
+    prompts = [Prompt.prompt_resume_preprocess(role, chunk, skill_list) for chunk in chunks]
+
     ollm_extractor = OllamaExtractor()
-    process_data = ollm_extractor.extract_data(prompt_text)
-    
-    if isinstance(process_data, str):
-        return parse_skills_text(process_data)
-        
-    return process_data
+    start = time.perf_counter()
+    # each chunk runs in a copy of the caller's context so its log records keep the request id
+    contexts = [contextvars.copy_context() for _ in prompts]
+    with ThreadPoolExecutor(max_workers=min(len(prompts), settings.EXTRACTION_CONCURRENCY)) as pool:
+        extractions = list(pool.map(
+            lambda context, prompt: context.run(ollm_extractor.extract_data_with_stats, prompt, schema=Prompt.RESUME_SKILLS_SCHEMA),
+            contexts,
+            prompts,
+        ))
+    extraction_ms = round((time.perf_counter() - start) * 1000, 2)
 
-@mcp.tool()
-def read_resume_from_file(file_name: str) -> str:
+    skills = []
+    seen = set()
+    failed_data = None
+    for process_data, _ in extractions:
+        if isinstance(process_data, str):
+            process_data = parse_skills_text(process_data)
+        if not isinstance(process_data, list):
+            failed_data = process_data
+            continue
+        for skill in process_data:
+            key = str(skill).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                skills.append(key)
+
+    metrics = {
+        "chunks": len(prompts),
+        "estimated_prompt_tokens": sum(Prompt.estimate_tokens(prompt) for prompt in prompts),
+        "prompt_tokens": sum(stats["prompt_tokens"] or 0 for _, stats in extractions),
+        "extraction_ms": extraction_ms,
+    }
+    if not skills and failed_data is not None:
+        return failed_data, metrics
+    return skills, metrics
+
+def read_resume_from_file(file_name: str) -> dict:
     """
     Read the resume from the given file path and extract text.
+    The text is kept on the server; pass the returned handle as `resume` to candidate_screening.
     
     Args:
         file_name: Name of the resume file (relative to uploads directory or absolute path)
         
     Returns:
-        The extracted resume text as a string.
+        A summary of the extracted resume: handle, file name, size and a short preview.
     """    
     # Handle relative paths (assume uploads directory)
-    print(f"file_name: {file_name}")
+    logger.debug("Reading resume", extra={"file_name": file_name})
+    document = document_store.find_by_file(Path(file_name).name)
+    if document is not None:
+        return document_store.summary(document["handle"])
+
     if not file_name.startswith('/'):
         uploads_dir = Path(__file__).parent.parent / "uploads"
         full_path = uploads_dir / file_name
@@ -129,39 +247,66 @@ def read_resume_from_file(file_name: str) -> str:
         full_path = Path(file_name)
     
     if not full_path.exists():
-        return f"Error: File not found at {full_path}"
-    print(f"full_path: {full_path}")
+        return {"error": f"File not found at {full_path}"}
+    logger.debug("Extracting resume", extra={"path": str(full_path)})
     try:
         # Extract text based on file type
-        if str(full_path).lower().endswith(".pdf"):
-            # Extract from PDF
-            return __extract_text_from_pdf(full_path)            
-        elif str(full_path).lower().endswith((".png", ".jpg", ".jpeg")):
-            # Extract from image using OCR
-            text = extract_text_from_image(str(full_path))
-            return text.strip()
-            
-        else:
-            return f"Error: Unsupported file type. Supported: PDF, PNG, JPG, JPEG"
-            
+        text = __extract_text_from_path(full_path)
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Error extracting text from file: {str(e)}"}
+
+    return register_document(text, full_path.name)
+
+
+def _fingerprint(text: str, file_name: Optional[str] = None) -> tuple[Optional[int], Optional[dict]]:
+    """
+    Look the text up in the near-duplicate index, adding it when it is new.
+    Returns the fingerprint id (None when detection is off, failed or the text is too short) and the
+    matched near-duplicate.
+    """
+    settings = get_settings()
+    if not settings.DUPLICATE_DETECTION or not fingerprints.has_enough_text(text):
+        return None, None
+    try:
+        signature = fingerprints.minhash(text)
+        return fingerprints.get_fingerprint_index().lookup(signature, settings.DUPLICATE_THRESHOLD, file_name)
     except Exception as e:
-        return f"Error extracting text from file: {str(e)}"
+        logger.warning("Near-duplicate detection failed", extra={"error": str(e)})
+        return None, None
 
 
-@mcp.tool()
-def get_interviewer_free_time(interviewer: str) -> dict:
+def register_document(text: str, file_name: Optional[str] = None) -> dict:
+    """
+    Store an extracted resume and return its summary, flagged with `duplicate_of` when it is a
+    near-duplicate of a resume seen before.
+    """
+    handle = document_store.put(text, file_name)
+    document = document_store.get(handle)
+    if document is not None and "fingerprint_id" not in document:
+        fingerprint_id, duplicate = _fingerprint(text, file_name)
+        duplicate_of = None
+        if duplicate is not None:
+            duplicate_of = {"file_name": duplicate["file_name"], "similarity": duplicate["similarity"]}
+        document_store.annotate(handle, fingerprint_id=fingerprint_id, duplicate_of=duplicate_of)
+    return document_store.summary(handle)
+
+
+def get_interviewer_free_time(interviewer: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
     """
     Get the free time of the given interviewer.
 
     Args:
         interviewer: Email address of the interviewer
+        start_date: Optional first day to check (YYYY-MM-DD), defaults to the current week
+        end_date: Optional last day to check (YYYY-MM-DD)
     Returns:
         A dictionary containing the free time of the interviewer.
     """
-    return CalendarService.get_free_time_from_google(interviewer)
+    return CalendarService.get_free_time_from_google(interviewer, start_date, end_date)
 
 # tools to check the free time in the teams calendar of interviewers and schedule a call
-@mcp.tool()
 def schedule_interview(to_email: str, start_time: str, end_time: str, candidate_name: str = None, role: str = None) -> dict:
     """
     Schedule an interview with the given interviewer for the given role.
@@ -176,24 +321,83 @@ def schedule_interview(to_email: str, start_time: str, end_time: str, candidate_
     """
     return CalendarService.schedule_interview_on_google(to_email, start_time, end_time, candidate_name, role)
 
-@mcp.tool()
 def candidate_screening(resume: str, role: str) -> dict:
     """
     Hybrid candidate screening that evaluates technical skills, soft skills, and certifications
     with weighted scoring using fuzzy and semantic matching.
+
+    Args:
+        resume: Handle returned by read_resume_from_file (e.g. "doc_3f9a1c2b7e") or the resume text
+        role: Role to screen the candidate for
     """
+    from rapidfuzz import fuzz
+
+    document = document_store.get(resume.strip())
+    resume = document_store.resolve(resume)
+    if resume is None:
+        return {"error": "Unknown or expired resume handle, read the resume file again with read_resume_from_file"}
+
     hr_skills = __load_hr_skills()
     role_skills = next((x["skills"] for x in hr_skills if x["role"].lower() == role.lower()), None)
 
     if not role_skills:
         return {"error": f"No skills found for the role: {role}"}
+
+    # a resume seen before (or a near-duplicate of one) reuses its earlier screening for the role
+    if document is not None and "fingerprint_id" in document:
+        fingerprint_id, duplicate_of = document["fingerprint_id"], document.get("duplicate_of")
+    else:
+        fingerprint_id, duplicate = _fingerprint(resume)
+        duplicate_of = {"file_name": duplicate["file_name"], "similarity": duplicate["similarity"]} if duplicate else None
+    skills_version = str(skills_file.stat().st_mtime_ns)
+    if fingerprint_id is not None:
+        try:
+            previous = fingerprints.get_fingerprint_index().get_screening(fingerprint_id, role, skills_version)
+        except Exception as e:
+            logger.warning("Could not read the previous screening", extra={"error": str(e)})
+            previous = None
+        if previous is not None:
+            previous["metrics"] = {"reused_screening": True, "llm_used": False}
+            if duplicate_of:
+                previous["duplicate_of"] = duplicate_of
+            return previous
  
-    resume_processed = __preprocess_resume(role, resume, role_skills)
+    # first pass: deterministic matching of the known skill vocabulary, the LLM is only a fallback/enrichment
+    start = time.perf_counter()
+    found_terms = skill_matcher.matcher_for(hr_skills, skills_file).find_terms(resume)
+    resume_processed = skill_matcher.matched_skills(role_skills, found_terms)
+    candidate_skills = set(found_terms)
+    metrics = {
+        "matched_terms": len(found_terms),
+        "matcher_ms": round((time.perf_counter() - start) * 1000, 2),
+        "llm_used": False,
+    }
+
+    settings = get_settings()
+    llm_mode = settings.SKILL_LLM_MODE
+    if llm_mode == "enrich" or (llm_mode == "fallback" and not resume_processed):
+        llm_skills, llm_metrics = __preprocess_resume(role, resume, role_skills)
+        metrics.update(llm_metrics, llm_used=True)
+        if isinstance(llm_skills, list):
+            resume_processed = resume_processed + llm_skills
+            candidate_skills.update(skill_matcher.normalize_skill(skill) for skill in llm_skills)
+        elif not resume_processed:
+            resume_processed = llm_skills
+    logger.info("Screening metrics", extra={"role": role, **metrics, "sampled": True})
 
     if not isinstance(resume_processed, list):
-        print(f"Resume processing failed :: {resume_processed}")
+        logger.error("Resume processing failed", extra={"response": str(resume_processed)[:500]})
         return {"error": "Resume processing failed"}
 
+    semantic = None
+    if settings.SEMANTIC_MATCHING:
+        try:
+            semantic = semantic_matcher.matcher_for(hr_skills, skills_file, settings.EMBEDDING_MODEL, settings.EMBEDDING_TIMEOUT)
+            resume_terms = resume_processed + semantic_matcher.resume_phrases(resume, settings.SEMANTIC_MAX_PHRASES)
+        except Exception as e:
+            logger.warning("Semantic matching unavailable, using fuzzy matching only", extra={"error": str(e)})
+            semantic = None
+
     categories = ["technical_skills", "soft_skills", "certifications"]
     results = {}
     for category in categories:
@@ -208,17 +412,29 @@ def candidate_screening(resume: str, role: str) -> dict:
             skill_names = category_data
         matched_skills = []
         missing_skills = []
-        
+
+        # one cosine-similarity matrix per category, e.g. "k8s" ~ "kubernetes", "team player" ~ "collaboration"
+        semantic_scores = {}
+        if semantic is not None:
+            try:
+                semantic_scores = semantic.similarities(skill_names, resume_terms)
+            except Exception as e:
+                logger.warning("Semantic matching failed", extra={"category": category, "error": str(e)})
+                # e.g. an embedding timeout, do not wait for it again on the next categories
+                semantic = None
+
         # check if resume_processed has similiarity with skill_names for eg: angularjs and angular like fuzzy matching
         for skill in skill_names:
-            found = False
-            for resume_skill in resume_processed:
-                if fuzz.ratio(skill, resume_skill) > 80:
-                    matched_skills.append(skill)
-                    found = True
-                    break
+            found = semantic_scores.get(skill, 0.0) >= settings.SEMANTIC_MATCH_THRESHOLD
             if not found:
-                missing_skills.append(skill)    
+                for resume_skill in resume_processed:
+                    if fuzz.ratio(skill, resume_skill) > 80:
+                        found = True
+                        break
+            if found:
+                matched_skills.append(skill)
+            else:
+                missing_skills.append(skill)
         
         results[category] = {
             "matched_skills": matched_skills,
@@ -237,7 +453,7 @@ def candidate_screening(resume: str, role: str) -> dict:
     total_skills = total_matched_count + total_missing_count
     match_percentage = (total_matched_count / total_skills) * 100 if total_skills > 0 else 0
 
-    return {
+    screening = {
         "results": results,
         "summary": {
             "role": role,
@@ -250,16 +466,57 @@ def candidate_screening(resume: str, role: str) -> dict:
                 "soft_skills": len(results["soft_skills"]["missing_skills"]),
                 "certifications": len(results["certifications"]["missing_skills"])},
             "match_percentage": round(match_percentage, 2)
-        }   
+        },
+        "skills": sorted(skill for skill in candidate_skills if skill),
     }
+    if fingerprint_id is not None:
+        try:
+            fingerprints.get_fingerprint_index().save_screening(fingerprint_id, role, skills_version, screening)
+        except Exception as e:
+            logger.warning("Could not store the screening fingerprint", extra={"error": str(e)})
+    if duplicate_of:
+        screening["duplicate_of"] = duplicate_of
+    screening["metrics"] = metrics
+    return screening
 
 
-app = FastAPI(title="hr",lifespan=lambda app: mcp.session_manager.run())
-app.mount("/hr", mcp.streamable_http_app())
+TOOLS = [read_resume_from_file, candidate_screening, get_interviewer_free_time, schedule_interview]
+
+def _build_mcp():
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("hr", stateless_http=True)
+    for tool in TOOLS:
+        server.tool()(tool)
+    return server
+
+def _build_app():
+    from fastapi import FastAPI
+
+    server = sys.modules[__name__].mcp
+    hr_app = FastAPI(title="hr", lifespan=lambda app: server.session_manager.run())
+    hr_app.mount("/hr", server.streamable_http_app())
+    return hr_app
+
+def __getattr__(name: str):
+    """
+    Build the MCP server and its ASGI app lazily, only when they are first accessed
+    (e.g. `uvicorn hrmcpserver.hrserver:app`), so in-process tool users skip FastMCP entirely.
+    """
+    builders = {"mcp": _build_mcp, "app": _build_app}
+    if name not in builders:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = builders[name]()
+    globals()[name] = value
+    return value
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="HR Server")
     parser.add_argument("--host", type=str, default="127.0.01", help="Host for the HR server")
     parser.add_argument("--port", type=int, default=8081, help="Port for the HR server")
     args = parser.parse_args()
-    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    import uvicorn
+    from core.log_utils import setup_logging
+
+    setup_logging()
+    uvicorn.run(sys.modules[__name__].app, host=args.host, port=args.port, log_level="info")
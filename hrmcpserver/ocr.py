@@ -0,0 +1,347 @@
+import io
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from core.env.env_utils import get_settings
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+"""
+ OCR for resume images. preprocessing works on NumPy arrays: percentile contrast stretch,
+ Otsu (global) or integral-image (adaptive) thresholding, upscaling only when the text lines
+ are too small for Tesseract, and an optional projection-profile deskew.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Tesseract OSD script names mapped to the language data used for them
+SCRIPT_LANGUAGES = {"Latin": "eng", "Arabic": "ara"}
+
+# Tesseract is most accurate when text lines are roughly 30-40px tall
+MIN_LINE_HEIGHT = 20
+TARGET_LINE_HEIGHT = 32
+TARGET_DPI = 300
+MAX_SCALE = 4.0
+
+
+def otsu_threshold(gray: "np.ndarray") -> int:
+    """
+    Return the threshold maximizing the between-class variance of the grayscale histogram,
+    as the first level of the lighter class (ink is `gray < threshold`).
+    """
+    import numpy as np
+
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    prob = hist / hist.sum()
+    omega = np.cumsum(prob)
+    mu = np.cumsum(prob * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1 - omega))
+    # between[k] splits the levels into [0, k] and [k + 1, 255]
+    return int(np.nanargmax(between)) + 1
+
+
+def adaptive_threshold(gray: "np.ndarray", block_size: int = 31, offset: int = 10) -> "np.ndarray":
+    """
+    Return the ink mask of pixels darker than their local mean minus offset,
+    with the local means computed from an integral image.
+    """
+    import numpy as np
+
+    half = block_size // 2
+    padded = np.pad(gray.astype(np.int64), half + 1, mode="edge")
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    height, width = gray.shape
+    window_sum = (
+        integral[block_size:block_size + height, block_size:block_size + width]
+        - integral[:height, block_size:block_size + width]
+        - integral[block_size:block_size + height, :width]
+        + integral[:height, :width]
+    )
+    return gray < (window_sum / (block_size * block_size) - offset)
+
+
+def _stretch_contrast(gray: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    low, high = np.percentile(gray, (1, 99))
+    if high - low < 1:
+        return gray
+    lookup = np.clip((np.arange(256) - low) * (255.0 / (high - low)), 0, 255).astype(np.uint8)
+    return lookup[gray]
+
+
+def estimate_line_height(ink: "np.ndarray") -> Optional[float]:
+    """
+    Estimate the text line height as the median run of consecutive rows containing ink.
+    """
+    import numpy as np
+
+    rows = np.concatenate(([False], ink.any(axis=1), [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(rows))
+    runs = edges[1::2] - edges[::2]
+    runs = runs[runs > 2]  # ignore specks and rules
+    return float(np.median(runs)) if len(runs) else None
+
+
+def _scale_factor(image: "Image.Image", ink: "np.ndarray") -> float:
+    line_height = estimate_line_height(ink)
+    if line_height:
+        if line_height >= MIN_LINE_HEIGHT:
+            return 1.0
+        return min(TARGET_LINE_HEIGHT / line_height, MAX_SCALE)
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] < TARGET_DPI:
+        return min(TARGET_DPI / float(dpi[0]), MAX_SCALE)
+    return 1.0
+
+
+def _deskew_angle(ink: "np.ndarray", max_angle: float = 5.0, step: float = 0.5) -> float:
+    """
+    Find the rotation maximizing the variance of the row projection profile (text lines horizontal).
+    """
+    import numpy as np
+    from PIL import Image
+
+    mask = Image.fromarray(ink.astype(np.uint8) * 255)
+    mask.thumbnail((800, 800))
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step, step):
+        profile = np.asarray(mask.rotate(float(angle), resample=Image.NEAREST)).sum(axis=1, dtype=np.int64)
+        score = float(profile.var())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def prepare_image_for_ocr(image: "Image.Image", threshold: str = "otsu", deskew: bool = False) -> "Image.Image":
+    """
+    Apply preprocessing steps to boost OCR accuracy, returning black text on a white background.
+
+    Args:
+        image: The source image
+        threshold: "otsu" for a global threshold, "adaptive" for unevenly lit photos/scans
+        deskew: Straighten text rotated by up to 5 degrees
+    """
+    import numpy as np
+    from PIL import Image
+
+    gray = _stretch_contrast(np.asarray(image.convert("L")))
+    ink = gray < otsu_threshold(gray)
+    if ink.mean() > 0.5:
+        # light text on a dark background
+        gray = 255 - gray
+        ink = ~ink
+
+    if deskew:
+        angle = _deskew_angle(ink)
+        if angle:
+            gray = np.asarray(Image.fromarray(gray).rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255))
+            ink = gray < otsu_threshold(gray)
+
+    # glyph size is measured after deskewing, skewed lines would look taller than they are
+    factor = _scale_factor(image, ink)
+    if factor > 1.0:
+        img = Image.fromarray(gray)
+        gray = np.asarray(img.resize((round(img.width * factor), round(img.height * factor)), Image.LANCZOS))
+        ink = None
+
+    if threshold == "adaptive":
+        ink = adaptive_threshold(gray)
+    elif ink is None:
+        ink = gray < otsu_threshold(gray)
+    return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8))
+
+
+class TesseractPool:
+    """
+    Pool of initialized in-process Tesseract engines (tesserocr), one set per language string.
+    Language data is loaded once per engine and the engines are reused across calls instead of
+    spawning a `tesseract` process per image like pytesseract does.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._engines: dict[str, queue.Queue] = {}
+        self._created: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _new_engine(self, languages: str):
+        from tesserocr import OEM, PSM, PyTessBaseAPI
+
+        if languages == "osd":
+            return PyTessBaseAPI(lang="osd", psm=PSM.OSD_ONLY)
+        return PyTessBaseAPI(lang=languages, psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+
+    @contextmanager
+    def engine(self, languages: str):
+        """
+        Borrow an engine for the given languages, creating one if the pool is not full yet.
+        """
+        with self._lock:
+            engines = self._engines.setdefault(languages, queue.Queue())
+            create = engines.empty() and self._created.get(languages, 0) < self.size
+            if create:
+                self._created[languages] = self._created.get(languages, 0) + 1
+        if create:
+            try:
+                api = self._new_engine(languages)
+            except Exception:
+                with self._lock:
+                    self._created[languages] -= 1
+                raise
+        else:
+            api = engines.get()
+        try:
+            yield api
+        finally:
+            api.Clear()
+            engines.put(api)
+
+    def image_to_string(self, image: "Image.Image", languages: str, whitelist: Optional[str] = None) -> str:
+        with self.engine(languages) as api:
+            # variables persist on a reused engine, so the whitelist is always (re)set
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+    def detect_script(self, image: "Image.Image") -> tuple[Optional[str], float]:
+        with self.engine("osd") as api:
+            api.SetImage(image)
+            osd = api.DetectOrientationScript() or {}
+            return osd.get("script_name"), float(osd.get("script_conf") or 0.0)
+
+
+_tesseract_pool: Optional[TesseractPool] = None
+_tesseract_pool_lock = threading.Lock()
+
+
+def get_tesseract_pool() -> TesseractPool:
+    global _tesseract_pool
+    with _tesseract_pool_lock:
+        if _tesseract_pool is None:
+            _tesseract_pool = TesseractPool(get_settings().OCR_POOL_SIZE)
+        return _tesseract_pool
+
+
+_ocr_timings: dict[str, dict] = {}
+_ocr_timings_lock = threading.Lock()
+
+
+def _record_timing(key: str, seconds: float):
+    with _ocr_timings_lock:
+        timing = _ocr_timings.setdefault(key, {"count": 0, "total_ms": 0.0})
+        timing["count"] += 1
+        timing["total_ms"] += seconds * 1000
+
+
+def ocr_metrics() -> dict:
+    """
+    Return the OCR call count, total and average time per language set ("osd" is script detection).
+    """
+    with _ocr_timings_lock:
+        return {
+            key: {
+                "count": timing["count"],
+                "total_ms": round(timing["total_ms"], 2),
+                "avg_ms": round(timing["total_ms"] / timing["count"], 2),
+            }
+            for key, timing in _ocr_timings.items()
+        }
+
+
+def detect_languages(image: "Image.Image", languages: list[str], backend: Optional[str] = None) -> str:
+    """
+    Pick the minimal Tesseract language set for the image by running script detection (OSD)
+    on a thumbnail. Falls back to all configured languages when the script is unknown or uncertain.
+    """
+    settings = get_settings()
+    backend = backend or settings.OCR_BACKEND
+    all_languages = "+".join(languages)
+    if len(languages) < 2:
+        return all_languages
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail((1000, 1000))
+    start = time.perf_counter()
+    try:
+        if backend == "tesserocr":
+            script, confidence = get_tesseract_pool().detect_script(thumbnail)
+        else:
+            import pytesseract
+
+            osd = pytesseract.image_to_osd(thumbnail, config="--psm 0", output_type=pytesseract.Output.DICT)
+            script, confidence = osd.get("script"), float(osd.get("script_conf") or 0.0)
+    except Exception as exc:
+        # OSD fails on images with too little text, or when osd.traineddata is missing
+        logger.warning("Script detection failed", extra={"languages": all_languages, "error": str(exc)})
+        return all_languages
+    finally:
+        _record_timing("osd", time.perf_counter() - start)
+
+    language = SCRIPT_LANGUAGES.get(script)
+    if language in languages and confidence >= settings.OCR_SCRIPT_MIN_CONFIDENCE:
+        return language
+    return all_languages
+
+
+def ocr_image(image: "Image.Image", languages: str, whitelist: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """
+    Run Tesseract on a preprocessed image with the configured backend:
+    "tesserocr" (pooled in-process engines) or "pytesseract" (a subprocess per call).
+    """
+    backend = backend or get_settings().OCR_BACKEND
+    start = time.perf_counter()
+    try:
+        if backend == "tesserocr":
+            return get_tesseract_pool().image_to_string(image, languages, whitelist)
+
+        import pytesseract
+
+        config = "--psm 6 --oem 3"
+        if whitelist:
+            config += f' -c tessedit_char_whitelist="{whitelist}"'
+        return pytesseract.image_to_string(image, lang=languages, config=config)
+    finally:
+        _record_timing(languages, time.perf_counter() - start)
+
+
+def extract_text_from_image(
+    image_source: Union[str, Path, bytes],
+    languages: Optional[str] = None,
+    whitelist: Optional[str] = None,
+    file_name: Optional[str] = None,
+) -> str:
+    """
+    Extract text from an image (PNG/JPG) using Tesseract OCR.
+    The image can be a path or the file content already in memory; the BytesIO wrapping the content
+    shares the buffer of a bytes object instead of copying it.
+    Without explicit languages, the language set is chosen per image by script detection.
+    """
+    from PIL import Image
+
+    settings = get_settings()
+    if isinstance(image_source, (str, Path)):
+        file_name = file_name or Path(image_source).name
+    else:
+        image_source = io.BytesIO(image_source)
+    try:
+        with Image.open(image_source) as img:
+            processed_img = prepare_image_for_ocr(img, settings.OCR_THRESHOLD, settings.OCR_DESKEW)
+            if languages is None:
+                if settings.OCR_SCRIPT_DETECTION:
+                    languages = detect_languages(processed_img, settings.OCR_LANGUAGES)
+                else:
+                    languages = "+".join(settings.OCR_LANGUAGES)
+            text = ocr_image(processed_img, languages, whitelist)
+            return text.strip()
+    except Exception as exc:
+        logger.error("Error extracting text from image", extra={"file_name": file_name, "error": str(exc)})
+        return ""
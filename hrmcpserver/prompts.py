@@ -1,12 +1,79 @@
 class Prompt:
+  # rough characters per token for English text on the llama/phi tokenizers
+  CHARS_PER_TOKEN = 4
+  # structured output schema for prompt_resume_preprocess
+  RESUME_SKILLS_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
   @staticmethod
-  def prompt_resume_preprocess(role: str, resume: str, skillset: dict):
+  def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without loading a tokenizer.
+    """
+    return (len(text) + Prompt.CHARS_PER_TOKEN - 1) // Prompt.CHARS_PER_TOKEN
+
+  @staticmethod
+  def compact_skillset(skillset) -> list[str]:
+    """
+    Flatten a (possibly nested) role skillset into a deduplicated list of skills, keeping the original order.
+    """
+    skills = []
+    seen = set()
+    pending = [skillset]
+    while pending:
+      item = pending.pop()
+      if isinstance(item, dict):
+        pending.extend(reversed(list(item.values())))
+      elif isinstance(item, (list, tuple)):
+        pending.extend(reversed(item))
+      elif isinstance(item, str) and item.strip().lower() not in seen:
+        seen.add(item.strip().lower())
+        skills.append(item.strip())
+    return skills
+
+  @staticmethod
+  def chunk_resume(resume: str, max_tokens: int) -> list[str]:
+    """
+    Split the resume on line boundaries into chunks that each fit in max_tokens.
+    Lines longer than a chunk are hard-split.
+    """
+    max_chars = max_tokens * Prompt.CHARS_PER_TOKEN
+    if len(resume) <= max_chars:
+      return [resume]
+
+    chunks = []
+    current = []
+    current_size = 0
+    for line in resume.splitlines():
+      if len(line) > max_chars and current:
+        # flush the lines before the long one first, chunks must keep the resume order
+        chunks.append("\n".join(current))
+        current = []
+        current_size = 0
+      while len(line) > max_chars:
+        chunks.append(line[:max_chars])
+        line = line[max_chars:]
+      if current_size + len(line) + 1 > max_chars and current:
+        chunks.append("\n".join(current))
+        current = []
+        current_size = 0
+      current.append(line)
+      current_size += len(line) + 1
+    if current:
+      chunks.append("\n".join(current))
+    return chunks
+
+  @staticmethod
+  def prompt_resume_preprocess(role: str, resume: str, skillset):
+    if not isinstance(skillset, list):
+      skillset = Prompt.compact_skillset(skillset)
+    # the resume goes last: chunks of the same role share the instruction and skillset prefix,
+    # so the model server can reuse its cached prefill for them
     prompt = f"""
       You are the hiring manager and reviewing the CV to onboard the candidate for the role : {role}:
     Instruction:
-      - evaluate the resume content : {resume}
-      - prepare the list of technical skill the candidate has based on the provided skillset : {skillset}
+      - prepare the list of technical skill the candidate has based on the provided skillset : {"; ".join(skillset)}
       - ensure all the list item is in lower case
-      - return the final response as a list of string strictly for eg ["skill1", "skill2"] 
+      - return the final response as a list of string strictly for eg ["skill1", "skill2"]
+      - evaluate the resume content : {resume}
     """
-    return prompt
\ No newline at end of file
+    return prompt
@@ -0,0 +1,134 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from hrmcpserver.prompts import Prompt
+from ollama_extractor import OllamaExtractor
+
+"""
+ semantic skill matching with a local embedding model: every role skill is embedded once and kept
+ as a normalized matrix (cached on disk, rebuilt when hrskills.json changes), resume skills are
+ embedded in one batch call and memoized, and each category is scored with a single matrix product.
+"""
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# resume fragments that look like a skill mention (bullets, comma separated lists, short lines)
+_PHRASE_SEPARATORS = re.compile(r"[\n,;|•·]")
+
+
+def resume_phrases(resume: str, max_phrases: int) -> list[str]:
+    """
+    Split the resume into short, unique phrases that can be compared with the role skills.
+    """
+    phrases = []
+    seen = set()
+    for fragment in _PHRASE_SEPARATORS.split(resume):
+        phrase = fragment.strip(" \t-*:.").lower()
+        if 2 <= len(phrase) <= 40 and phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+            if len(phrases) >= max_phrases:
+                break
+    return phrases
+
+
+class SemanticMatcher:
+
+    def __init__(self, hr_skills: list[dict], skills_path: Path, model: str, extractor: Optional[OllamaExtractor] = None, memo_size: int = 10000, timeout: Optional[float] = None):
+        self.model = model
+        self.timeout = timeout
+        self.extractor = extractor or OllamaExtractor()
+        self.memo_size = memo_size
+        self._memo: OrderedDict = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._digest = hashlib.sha256(skills_path.read_bytes() + model.encode()).hexdigest()
+        skills = list(dict.fromkeys(skill for role in hr_skills for skill in Prompt.compact_skillset(role["skills"])))
+        self._skill_rows = {skill: row for row, skill in enumerate(skills)}
+        self._skill_matrix = self._load_or_build_matrix(skills)
+
+    def _cache_file(self) -> Path:
+        return CACHE_DIR / f"skill_embeddings_{re.sub(r'[^a-zA-Z0-9_.-]', '_', self.model)}.npz"
+
+    def _load_or_build_matrix(self, skills: list[str]):
+        import numpy as np
+
+        cache_file = self._cache_file()
+        if cache_file.exists():
+            with np.load(cache_file, allow_pickle=False) as cached:
+                if str(cached["digest"]) == self._digest:
+                    return cached["vectors"]
+
+        # a timeout raises here, and the screening falls back to lexical matching
+        matrix = self._normalize(np.asarray(self.extractor.embed(skills, self.model, timeout=self.timeout), dtype=np.float32))
+        CACHE_DIR.mkdir(exist_ok=True)
+        np.savez(cache_file, digest=np.asarray(self._digest), vectors=matrix)
+        return matrix
+
+    @staticmethod
+    def _normalize(matrix):
+        import numpy as np
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _embed_resume_skills(self, resume_skills: list[str]):
+        """
+        Embed the resume skills, calling the model once for the ones not seen before.
+        """
+        import numpy as np
+
+        keys = list(dict.fromkeys(skill.strip().lower() for skill in resume_skills if skill.strip()))
+        if not keys:
+            return np.zeros((0, self._skill_matrix.shape[1]), dtype=np.float32)
+        # memoized vectors are taken in the same critical section that finds them, another thread may evict them afterwards
+        vectors = {}
+        with self._memo_lock:
+            for key in keys:
+                vector = self._memo.get(key)
+                if vector is not None:
+                    vectors[key] = vector
+                    self._memo.move_to_end(key)
+        missing = [key for key in keys if key not in vectors]
+        if missing:
+            embedded = self._normalize(np.asarray(self.extractor.embed(missing, self.model, timeout=self.timeout), dtype=np.float32))
+            with self._memo_lock:
+                for key, vector in zip(missing, embedded):
+                    vectors[key] = vector
+                    self._memo[key] = vector
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return np.stack([vectors[key] for key in keys])
+
+    def similarities(self, skill_names: list[str], resume_skills: list[str]) -> dict:
+        """
+        Return, for each role skill, the highest cosine similarity to any of the resume skills.
+        """
+        rows = [self._skill_rows[skill] for skill in skill_names if skill in self._skill_rows]
+        if not rows or not resume_skills:
+            return {}
+        resume_matrix = self._embed_resume_skills(resume_skills)
+        if not len(resume_matrix):
+            return {}
+        scores = (self._skill_matrix[rows] @ resume_matrix.T).max(axis=1)
+        known = [skill for skill in skill_names if skill in self._skill_rows]
+        return dict(zip(known, scores.tolist()))
+
+
+_matcher_cache: dict = {}
+
+
+def matcher_for(hr_skills: list[dict], skills_path: Path, model: str, timeout: Optional[float] = None) -> SemanticMatcher:
+    """
+    Return the semantic matcher for the current version of the skills file, keeping its resume-skill memo across calls.
+    """
+    key = (str(skills_path), skills_path.stat().st_mtime_ns, model)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        matcher = SemanticMatcher(hr_skills, skills_path, model, timeout=timeout)
+        _matcher_cache.clear()
+        _matcher_cache[key] = matcher
+    return matcher
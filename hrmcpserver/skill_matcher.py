@@ -0,0 +1,181 @@
+import re
+from collections import deque
+from pathlib import Path
+from typing import Iterable
+
+from hrmcpserver.prompts import Prompt
+
+"""
+ deterministic skill extraction: every role skill in hrskills.json is split into short terms
+ (e.g. "HTML5, CSS3, SCSS" -> html5 / css3 / scss), and an Aho-Corasick automaton over the
+ term token sequences finds all of them in one linear scan of the resume.
+"""
+
+# spelling variants mapped to the token used in hrskills.json
+ALIASES = {
+    "angularjs": "angular",
+    "angular.js": "angular",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nodejs": "node.js",
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "postgres": "postgresql",
+    "html": "html5",
+    "css": "css3",
+    "es6": "es6+",
+}
+
+CATEGORIES = ["technical_skills", "soft_skills", "certifications"]
+
+STOPWORDS = {"and", "or", "etc", "of", "for", "the", "with", "a", "an", "in", "to", "on", "e.g", "eg", "using", "like"}
+
+# single-word terms too common in resumes to count as evidence on their own
+GENERIC_TERMS = {"map", "default", "operators", "features", "design", "system", "resolve", "services"}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9@][a-z0-9+#.@-]*[a-z0-9+#]|[a-z0-9]")
+_PART_SEPARATORS = re.compile(r"[,/();:]|\band\b|\bor\b")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-case the text, split it into tokens (keeping c++, c#, node.js, es6+ intact) and apply the aliases.
+    """
+    return [ALIASES.get(token, token) for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Normalize a free-form skill (e.g. from the LLM or a search query) the same way as the matched terms.
+    """
+    return " ".join(token for token in tokenize(skill) if token not in STOPWORDS)
+
+
+def skill_terms(skill: str) -> list[str]:
+    """
+    Split a role skill description into the terms that count as evidence for it.
+    """
+    terms = []
+    for part in _PART_SEPARATORS.split(skill.lower()):
+        tokens = [token for token in tokenize(part) if token not in STOPWORDS]
+        if not tokens:
+            continue
+        term = " ".join(tokens)
+        if term not in GENERIC_TERMS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over token sequences, so "go" never matches inside "google"
+    and multi-word terms like "dependency injection" match as a phrase.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: list[dict] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[set] = [set()]
+        for term in terms:
+            self._add(term)
+        self._build_failure_links()
+
+    def _add(self, term: str):
+        state = 0
+        for token in term.split(" "):
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(term)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find_terms(self, text: str) -> set[str]:
+        """
+        Return every known term that occurs in the text.
+        """
+        found = set()
+        state = 0
+        # stopwords are dropped exactly like in skill_terms, "unit testing with jasmine" -> unit testing jasmine
+        for token in tokenize(text):
+            if token in STOPWORDS:
+                continue
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+def matched_skills(role_skills, found_terms: set[str]) -> list[str]:
+    """
+    Return the role skills for which at least one of their terms was found.
+    """
+    return [skill for skill in Prompt.compact_skillset(role_skills) if any(term in found_terms for term in skill_terms(skill))]
+
+
+def role_term_index(role_skills: dict) -> list[tuple[str, str, frozenset]]:
+    """
+    Precompute (category, skill, terms) for every skill of a role, for scoring many candidates against it.
+    """
+    return [
+        (category, skill, frozenset(skill_terms(skill)))
+        for category in CATEGORIES
+        for skill in Prompt.compact_skillset(role_skills.get(category) or [])
+    ]
+
+
+def score_terms(role_index: list[tuple[str, str, frozenset]], found_terms: set[str]) -> tuple[dict, float]:
+    """
+    Score a candidate's stored skill terms against a role without the LLM or the original resume.
+
+    Returns:
+        The per-category matched/missing skills and the match percentage.
+    """
+    results = {category: {"matched_skills": [], "missing_skills": []} for category in CATEGORIES}
+    matched = 0
+    for category, skill, terms in role_index:
+        if terms.isdisjoint(found_terms):
+            results[category]["missing_skills"].append(skill)
+        else:
+            results[category]["matched_skills"].append(skill)
+            matched += 1
+    match_percentage = round(matched / len(role_index) * 100, 2) if role_index else 0
+    return results, match_percentage
+
+
+_matcher_cache: dict = {}
+
+
+def matcher_for(hr_skills: list[dict], skills_path: Path) -> SkillMatcher:
+    """
+    Build (once per version of the skills file) a matcher over the skills of every role.
+    """
+    key = (str(skills_path), skills_path.stat().st_mtime_ns)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        terms = {term for role in hr_skills for skill in Prompt.compact_skillset(role["skills"]) for term in skill_terms(skill)}
+        matcher = SkillMatcher(terms)
+        _matcher_cache.clear()
+        _matcher_cache[key] = matcher
+    return matcher
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, FastAPI, Form, UploadFile, File, HTTPException
+from fastapi import APIRouter, BackgroundTasks, FastAPI, Form, UploadFile, File, HTTPException
 
-import shutil
+import asyncio
 import aiofiles
-from hrmcpserver import hrserver
-import base64
-import httpx
+from pathlib import Path
+from hrmcpserver import hrserver, ocr
+from hrmcpserver.document_store import document_store
 from typing import List, Optional
-import ollama
 from fastapi import Depends
 from middleware import auth_middleware
+from auth.db_handler import DatabaseHandler
+import hashlib
+import logging
+import intent_router
+from response_cache import CALENDAR_TOOLS, SCREENING_TOOLS, response_cache
+from core.env.env_utils import get_settings
+from core.timing import timed
 
 
 router = APIRouter(
@@ -16,77 +22,149 @@ router = APIRouter(
     tags=["index"],
 )
 
+logger = logging.getLogger(__name__)
+
 UPLOAD_DIR = "./uploads/"
 
-def process_chat_message(message: str) -> str:
+def _screening_record(screening: dict, file_name: Optional[str], resume: str) -> dict:
     """
-    Process a chat message using Ollama and available tools.
+    Build the candidate document stored for a successful candidate_screening tool call.
     """
-    """ System prompt to inform the model about the tool is usage """
-    system_message = {
-        "role": "system", 
-        "content": f""" You are a HR management assistant. You can do following actions:
-                   - read or extract text from image using 'mcp/hr/read_resume_from_file' 
-                   - candidate screening or review cv using 'mcp/hr/candidate_screening'
-                   - can get available time slots using 'mcp/hr/get_interviewer_free_time' and 
-                   - can schedule an interview using 'mcp/hr/schedule_interview' if needed.
-
-                   Response format:
-                   - if you need to perform an action, CALL THE TOOL DIRECTLY. Do not describe what you are going to do, just call the tool.
-                   - if you have the final answer, provide formatted response for eg. "based on your input, here is the final summar \n <final answer>".
-                   - structure the response with proper paragraph and list and heading.
-                   - if the action is not clear, provide a text response.
-                   - if you need to ask the user a clarifying question, provide a text response.
-
-                Important Note: donot include tool call in the response. just provide the final answer.
-                   """
+    if not file_name:
+        document = document_store.get(resume.strip())
+        file_name = document.get("file_name") if document else None
+    if not file_name:
+        file_name = f"text:{hashlib.sha1(resume.encode()).hexdigest()[:12]}"
+    record = {
+        "file_name": file_name,
+        "role": screening["summary"]["role"].lower(),
+        "skills": screening["skills"],
+        "match_percentage": screening["summary"]["match_percentage"],
+        "results": screening["results"],
+        "summary": screening["summary"],
     }
-    # User asks a question
-    user_message = {
-        "role": "user", 
-        "content": message
+    if screening.get("duplicate_of"):
+        record["duplicate_of"] = screening["duplicate_of"]
+    return record
+
+def _collect_screenings(tool_calls: list, screenings: Optional[list]):
+    """
+    Append the candidate record of every successful candidate_screening in the executed (func, arguments, result) calls.
+    """
+    if screenings is None:
+        return
+    last_file_name = None
+    for func, arguments, result in tool_calls:
+        if func is hrserver.read_resume_from_file:
+            last_file_name = arguments.get("file_name")
+        elif func is hrserver.candidate_screening and isinstance(result, dict) and "summary" in result:
+            screenings.append(_screening_record(result, last_file_name, arguments.get("resume", "")))
+
+def _tool_content(func, result) -> str:
+    """
+    Compact tool result for the model: screening internals (normalized skills, metrics) are left out.
+    """
+    if func is hrserver.candidate_screening and isinstance(result, dict):
+        result = {key: value for key, value in result.items() if key not in ("skills", "metrics")}
+    return str(result)
+
+# The system prompt and tool list are module constants so that every ollama.chat call, within a turn and
+# across requests, starts with a byte-identical prefix and Ollama can reuse its KV cache for it.
+SYSTEM_PROMPT = """You are a HR management assistant. You can do following actions:
+- read or extract text from image using 'mcp/hr/read_resume_from_file', it returns a resume handle (e.g. doc_3f9a1c2b7e) and a preview
+- candidate screening or review cv using 'mcp/hr/candidate_screening', pass the resume handle as 'resume' instead of the resume text
+- can get available time slots using 'mcp/hr/get_interviewer_free_time' and
+- can schedule an interview using 'mcp/hr/schedule_interview' if needed.
+
+Response format:
+- if you need to perform an action, CALL THE TOOL DIRECTLY. Do not describe what you are going to do, just call the tool.
+- if you have the final answer, provide formatted response for eg. "based on your input, here is the final summar \n <final answer>".
+- structure the response with proper paragraph and list and heading.
+- if the action is not clear, provide a text response.
+- if you need to ask the user a clarifying question, provide a text response.
+
+Important Note: donot include tool call in the response. just provide the final answer."""
+
+CHAT_MODEL = "llama3.2"
+AVAILABLE_TOOLS = [hrserver.read_resume_from_file, hrserver.candidate_screening, hrserver.get_interviewer_free_time, hrserver.schedule_interview]
+TOOL_MAP = {tool.__name__: tool for tool in AVAILABLE_TOOLS}
+
+def _ns_to_ms(nanoseconds: Optional[int]) -> Optional[float]:
+    return round(nanoseconds / 1e6, 2) if nanoseconds else None
+
+def _round_metrics(response) -> dict:
+    """
+    Prefill/decode token counts and timings of one ollama.chat call. A prompt_eval_count well below the
+    prompt size on later rounds means the cached prefix was reused.
+    """
+    return {
+        "prompt_tokens": response.prompt_eval_count,
+        "prefill_ms": _ns_to_ms(response.prompt_eval_duration),
+        "eval_tokens": response.eval_count,
+        "eval_ms": _ns_to_ms(response.eval_duration),
+        "load_ms": _ns_to_ms(response.load_duration),
+        "total_ms": _ns_to_ms(response.total_duration),
     }
-    messages = [system_message, user_message]
-    available_tools = [ hrserver.read_resume_from_file, hrserver.candidate_screening, hrserver.get_interviewer_free_time , hrserver.schedule_interview]
-    
-    
+
+def process_chat_message(message: str, tool_calls: Optional[list] = None, llm_rounds: Optional[list] = None) -> str:
+    """
+    Process a chat message using Ollama and available tools.
+    The executed (func, arguments, result) tool calls are appended to `tool_calls` (if given) so the caller can
+    persist the screenings, and the prefill/decode metrics of every model call to `llm_rounds`.
+    """
+    import ollama
+
+    # the history is append-only within a turn so each call extends the previous prompt
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": message},
+    ]
+    keep_alive = get_settings().OLLAMA_KEEP_ALIVE
+
+    def chat_round():
+        with timed("llm"):
+            response = ollama.chat(
+                model=CHAT_MODEL,
+                messages=messages,
+                tools=AVAILABLE_TOOLS,
+                keep_alive=keep_alive,
+            )
+        if llm_rounds is not None:
+            llm_rounds.append(_round_metrics(response))
+        return response
+
     # Initial call to the model
-    response = ollama.chat(
-        model="llama3.2",
-        messages=messages,
-        tools=available_tools,
-    )
+    response = chat_round()
     
     # Loop to handle tool calls
+    if tool_calls is None:
+        tool_calls = []
     while response.message.tool_calls:
         # Add the assistant's message with tool calls to history
         messages.append(response.message)
         
-        tool_map = {tool.__name__: tool for tool in available_tools}
-        
         for tool_call in response.message.tool_calls:
-            print(f"Tool called: {tool_call.function.name} with arguments: {tool_call.function.arguments}")
-            func = tool_map.get(tool_call.function.name)
+            logger.info("Tool called", extra={"tool": tool_call.function.name, "arguments": tool_call.function.arguments, "sampled": True})
+            func = TOOL_MAP.get(tool_call.function.name)
             if func:
                 try:
-                    result = func(**tool_call.function.arguments)
+                    with timed(f"tool.{func.__name__}"):
+                        result = func(**tool_call.function.arguments)
+                    tool_calls.append((func, tool_call.function.arguments, result))
                     # Add the tool result to history
                     messages.append({
                         "role": "tool",
-                        "content": str(result),
+                        "content": _tool_content(func, result),
                     })
                 except Exception as e:
+                    tool_calls.append((func, tool_call.function.arguments, {"error": str(e)}))
                     messages.append({
                         "role": "tool",
                         "content": f"Error executing tool {tool_call.function.name}: {str(e)}",
                     })
         
         # Get the next response from the model
-        response = ollama.chat(
-            model="llama3.2",
-            messages=messages,
-            tools=available_tools,
-        )
+        response = chat_round()
 
     return response.message.content
 
@@ -110,26 +188,86 @@ def chat_interface():
             print(f"An error occurred: {e}")
 
 
-@router.post("/chat", dependencies=[Depends(auth_middleware)])
-async def chat(message: str = Form(...)):
+@router.post("/chat")
+async def chat(message: str = Form(...), user: dict = Depends(auth_middleware)):
     """
     Chat endpoint for HR management
      - this will accept the input from the user as a plain text, plan the action with the ollama model to execute the available tools
      - this will call the right tool based on the plan and return the result as the plain text
+     - recognized commands (screen a file for a role, free time for an email) skip the model and call the tools directly
+     - with RESPONSE_CACHE_ENABLED, repeated questions of the same user are answered from the response cache
     """
-    result = process_chat_message(message)
-    return {"result": result}
+    cache_enabled = get_settings().RESPONSE_CACHE_ENABLED
+    if cache_enabled:
+        with timed("cache"):
+            cached = await asyncio.to_thread(response_cache.get, user.get("sub", ""), message)
+        if cached is not None:
+            return {"result": cached, "metrics": {"llm_rounds": [], "cached": True}}
+
+    tool_calls = []
+    llm_rounds = []
+    fast_path = intent_router.route(message)
+    if fast_path is not None:
+        result = fast_path.text
+        tool_calls = fast_path.tool_calls
+    else:
+        result = process_chat_message(message, tool_calls, llm_rounds)
+
+    tool_names = {func.__name__ for func, _, _ in tool_calls}
+    if cache_enabled:
+        if hrserver.schedule_interview.__name__ in tool_names:
+            response_cache.invalidate(CALENDAR_TOOLS)
+        if hrserver.candidate_screening.__name__ in tool_names:
+            response_cache.invalidate(SCREENING_TOOLS)
+        # only answers computed from tools that succeeded: no tool errors, no clarification questions
+        failed = any(isinstance(result, dict) and "error" in result for _, _, result in tool_calls)
+        if tool_calls and not failed:
+            await asyncio.to_thread(response_cache.put, user.get("sub", ""), message, result, tool_names)
+
+    screenings = []
+    _collect_screenings(tool_calls, screenings)
+    for screening in screenings:
+        try:
+            with timed("db"):
+                await DatabaseHandler.save_candidate(screening)
+        except Exception as e:
+            logger.error("Failed to store screening", extra={"file_name": screening["file_name"], "error": str(e)})
+    return {"result": result, "metrics": {"llm_rounds": llm_rounds, "cached": False}}
+
+async def _persist_upload(file_path: str, data: bytes):
+    async with aiofiles.open(file_path, "wb") as buffer:
+        await buffer.write(data)
 
 @router.post("/upload", dependencies=[Depends(auth_middleware)])
-async def upload_file(file: UploadFile = File(...), role: str = Form(...)):
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...), role: str = Form(...)):
+    """
+    Extract the resume text straight from the uploaded buffer; the original is written to disk in the background.
+    """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file uploaded")
     
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_name = Path(file.filename).name
+    file_path = f"{UPLOAD_DIR}/{file_name}"
+    data = await file.read()
+    background_tasks.add_task(_persist_upload, file_path, data)
+
+    try:
+        with timed("extract"):
+            text = await asyncio.to_thread(hrserver.extract_text_from_bytes, memoryview(data), file_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    document = await asyncio.to_thread(hrserver.register_document, text, file_name)
+    # a re-upload changes what screening answers about this file would say
+    response_cache.invalidate(SCREENING_TOOLS)
+
+    response = {"info": "File saved successfully", "file_path": file_path , "role": role, "handle": document["handle"], "extracted_chars": len(text)}
+    if document.get("duplicate_of"):
+        response["duplicate_of"] = document["duplicate_of"]
+    return response
 
-    return {"info": "File saved successfully", "file_path": file_path , "role": role}
+@router.get("/metrics", dependencies=[Depends(auth_middleware)])
+async def metrics():
+    return {"ocr": ocr.ocr_metrics(), "intents": intent_router.intent_metrics(), "response_cache": response_cache.metrics()}
 
 @router.get("/test")
 async def read_root():
@@ -0,0 +1,218 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List
+import contextvars
+import hashlib
+import json
+import time
+import zipfile
+
+from core.env.env_utils import get_settings
+from hrmcpserver import hrserver
+from middleware import auth_middleware
+from response_cache import SCREENING_TOOLS, response_cache
+
+"""
+ bulk resume ingestion: a ZIP export and/or several resumes in one multipart upload.
+ the uploads are spooled to disk by the multipart parser and ZIP entries are read one at a
+ time from the spooled file; extraction runs on a worker pool with a bounded number of entries
+ in flight, and the progress of every file is streamed back as NDJSON.
+"""
+
+router = APIRouter(
+    prefix="",
+    tags=["ingest"],
+)
+
+UPLOAD_DIR = Path("./uploads/")
+SUPPORTED_EXTENSIONS = (".pdf",) + hrserver.IMAGE_EXTENSIONS
+MB = 1024 * 1024
+
+
+class IngestLimits:
+
+    def __init__(self, max_entries: int, max_total_bytes: int, max_file_bytes: int):
+        self.max_entries = max_entries
+        self.max_total_bytes = max_total_bytes
+        self.max_file_bytes = max_file_bytes
+        self.entries = 0
+        self.total_bytes = 0
+
+    @classmethod
+    def from_settings(cls) -> "IngestLimits":
+        settings = get_settings()
+        return cls(settings.INGEST_MAX_ENTRIES, settings.INGEST_MAX_TOTAL_MB * MB, settings.INGEST_MAX_FILE_MB * MB)
+
+    @property
+    def full(self) -> bool:
+        return self.entries >= self.max_entries
+
+    def check(self, size: int):
+        """
+        Account for one more file of the given size, raising ValueError when a cap is exceeded.
+        """
+        if self.entries >= self.max_entries:
+            raise ValueError(f"More than {self.max_entries} files")
+        if size > self.max_file_bytes:
+            raise ValueError(f"File larger than {self.max_file_bytes // MB} MB")
+        if self.total_bytes + size > self.max_total_bytes:
+            raise ValueError(f"Upload larger than {self.max_total_bytes // MB} MB in total")
+        self.entries += 1
+        self.total_bytes += size
+
+
+def _read_limited(stream, limit: int) -> bytes:
+    """
+    Read at most limit bytes; the declared size of a ZIP entry is not trusted (zip bombs).
+    """
+    data = stream.read(limit + 1)
+    if len(data) > limit:
+        raise ValueError(f"File larger than {limit // MB} MB")
+    return data
+
+
+def iter_upload_entries(files: List[UploadFile], limits: IngestLimits) -> Iterator[tuple[str, object]]:
+    """
+    Yield (file_name, bytes) for every resume in the uploads, unpacking ZIP archives entry by entry,
+    or (file_name, ValueError) for an entry that is skipped. ZIP entries are named by their path in
+    the archive. Once the entry cap is reached nothing more is read: a single skipped entry is
+    yielded for the rest of the upload.
+    """
+    for upload in files:
+        name = Path(upload.filename or "").name
+        if limits.full:
+            yield name, ValueError(f"More than {limits.max_entries} files, the rest of the upload was not read")
+            return
+        if name.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(upload.file)
+            except zipfile.BadZipFile as e:
+                yield name, ValueError(f"Invalid ZIP archive: {e}")
+                continue
+            with archive:
+                for info in archive.infolist():
+                    entry_name = Path(info.filename).name
+                    if info.is_dir() or info.filename.startswith("__MACOSX/") or entry_name.startswith("."):
+                        continue
+                    if not entry_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        yield info.filename, ValueError("Unsupported file type")
+                        continue
+                    if limits.full:
+                        # checked before decompressing anything
+                        yield info.filename, ValueError(f"More than {limits.max_entries} files, the rest of the upload was not read")
+                        return
+                    try:
+                        with archive.open(info) as entry:
+                            data = _read_limited(entry, limits.max_file_bytes)
+                        limits.check(len(data))
+                    except (ValueError, zipfile.BadZipFile) as e:
+                        yield info.filename, ValueError(str(e))
+                        continue
+                    except RuntimeError:
+                        # zipfile raises RuntimeError for encrypted entries
+                        yield info.filename, ValueError("Encrypted entry, password required")
+                        continue
+                    yield info.filename, data
+        elif name.lower().endswith(SUPPORTED_EXTENSIONS):
+            try:
+                data = _read_limited(upload.file, limits.max_file_bytes)
+                limits.check(len(data))
+            except ValueError as e:
+                yield name, e
+                continue
+            yield name, data
+        else:
+            yield name, ValueError("Unsupported file type")
+
+
+def stored_name(file_name: str, data: bytes) -> str:
+    """
+    Name of an ingested file in the uploads directory: a content-hash prefix keeps entries with the
+    same base name (a/cv.pdf and b/cv.pdf) from overwriting each other.
+    """
+    return f"{hashlib.sha256(data).hexdigest()[:10]}_{Path(file_name).name}"
+
+
+def ingest_file(file_name: str, data: bytes) -> dict:
+    """
+    Save one resume to the uploads directory, extract its text and register it in the document store
+    under its stored name.
+    """
+    start = time.perf_counter()
+    stored_as = stored_name(file_name, data)
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    (UPLOAD_DIR / stored_as).write_bytes(data)
+    try:
+        text = hrserver.extract_text_from_bytes(memoryview(data), stored_as)
+        document = hrserver.register_document(text, stored_as)
+    except Exception as e:
+        return {"file_name": file_name, "stored_as": stored_as, "status": "failed", "error": str(e)}
+    response_cache.invalidate(SCREENING_TOOLS)
+    event = {
+        "file_name": file_name,
+        "stored_as": stored_as,
+        "status": "ok",
+        "handle": document["handle"],
+        "chars": document["chars"],
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    if document.get("duplicate_of"):
+        event["duplicate_of"] = document["duplicate_of"]
+    return event
+
+
+def _skipped(file_name: str, error: ValueError) -> Future:
+    future = Future()
+    future.set_result({"file_name": file_name, "status": "skipped", "error": str(error)})
+    return future
+
+
+def ingest_events(files: List[UploadFile], limits: IngestLimits, workers: int) -> Iterator[dict]:
+    """
+    Extract the uploaded resumes in parallel, yielding a progress event per file followed by a summary
+    event. Events come in upload order: a finished file waits for the ones before it, skipped entries
+    included.
+    """
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for file_name, data in iter_upload_entries(files, limits):
+            if isinstance(data, ValueError):
+                pending.append(_skipped(file_name, data))
+            else:
+                # the copied context keeps the request id on the worker's log records
+                pending.append(executor.submit(contextvars.copy_context().run, ingest_file, file_name, data))
+            # keep at most two entries per worker in memory
+            while len(pending) >= workers * 2 or (pending and pending[0].done()):
+                event = pending.pop(0).result()
+                counts[event["status"]] += 1
+                yield event
+        for future in pending:
+            event = future.result()
+            counts[event["status"]] += 1
+            yield event
+    yield {"status": "done", **counts, "took_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def _ndjson(events: Iterator[dict]) -> Iterator[bytes]:
+    for event in events:
+        yield (json.dumps(event) + "\n").encode()
+
+
+@router.post("/ingest", dependencies=[Depends(auth_middleware)])
+async def ingest(files: List[UploadFile] = File(...)):
+    """
+    Ingest many resumes at once: ZIP archives and/or PDF/PNG/JPG files.
+    Streams one JSON line per file (status ok/failed/skipped, handle, duplicate_of) and a final summary line.
+    """
+    limits = IngestLimits.from_settings()
+    total_size = sum(upload.size or 0 for upload in files)
+    if total_size > limits.max_total_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload larger than {limits.max_total_bytes // MB} MB in total")
+    return StreamingResponse(
+        _ndjson(ingest_events(files, limits, get_settings().INGEST_WORKERS)),
+        media_type="application/x-ndjson",
+    )
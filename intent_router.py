@@ -0,0 +1,160 @@
+import logging
+import re
+import threading
+from typing import NamedTuple, Optional
+
+from core.timing import timed
+from hrmcpserver import hrserver
+
+"""
+ deterministic fast path in front of the LLM planner: structured commands such as
+ "I have uploaded a file named cv.pdf. screen for angular developer", "screen cv.pdf for flutter developer"
+ or "free time for alice@example.com" call the hrserver tools directly. anything else goes to the LLM.
+"""
+
+logger = logging.getLogger(__name__)
+
+_FILE_PATTERN = re.compile(r"(?P<file>[\w\-./()]+?\.(?:pdf|png|jpe?g))\b", re.IGNORECASE)
+_UPLOAD_PATTERN = re.compile(r"uploaded a file named\s+(?P<file>.+?\.(?:pdf|png|jpe?g))\b", re.IGNORECASE)
+_SCREEN_PATTERN = re.compile(r"\b(?:screen|review|evaluate|assess)\b", re.IGNORECASE)
+_EMAIL = r"(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)"
+# the whole message must be the command, an email next to other words ("feel free to ask",
+# "what are the available roles?") goes to the LLM
+_FREE_TIME_PATTERNS = [
+    # "free time for <email>", "check availability of <email>?"
+    re.compile(
+        r"(?:(?:please\s+)?(?:show|get|check|find|list)\s+(?:me\s+)?)?(?:the\s+)?"
+        r"(?:free\s+(?:time|slots?)|availability|available\s+(?:times?|slots?))\s+(?:for|of)\s+" + _EMAIL + r"\s*[?.!]?",
+        re.IGNORECASE,
+    ),
+    # "when is <email> free?"
+    re.compile(r"when\s+is\s+" + _EMAIL + r"\s+(?:free|available)\s*[?.!]?", re.IGNORECASE),
+]
+# words that mean the user wants more than the fast path can do
+_AMBIGUOUS_PATTERN = re.compile(r"\b(?:schedule|book|invite|and then|compare)\b", re.IGNORECASE)
+
+
+class FastPathResult(NamedTuple):
+    intent: str
+    text: str
+    # executed (func, arguments, result) calls, same shape as the LLM tool loop
+    tool_calls: list
+
+
+_counts = {"fast_path": 0, "llm": 0}
+_intent_counts: dict[str, int] = {}
+_counts_lock = threading.Lock()
+
+
+def intent_metrics() -> dict:
+    """
+    Return how much chat traffic was answered by the fast path versus the LLM.
+    """
+    with _counts_lock:
+        total = _counts["fast_path"] + _counts["llm"]
+        return {
+            "fast_path": _counts["fast_path"],
+            "llm": _counts["llm"],
+            "fast_path_ratio": round(_counts["fast_path"] / total, 4) if total else 0.0,
+            "intents": dict(_intent_counts),
+        }
+
+
+def _find_role(message: str) -> Optional[str]:
+    lowered = message.lower()
+    roles = sorted((role["role"] for role in hrserver.load_hr_skills()), key=len, reverse=True)
+    return next((role for role in roles if role.lower() in lowered), None)
+
+
+def _find_file(message: str) -> Optional[str]:
+    match = _UPLOAD_PATTERN.search(message) or _FILE_PATTERN.search(message)
+    return match.group("file").strip() if match else None
+
+
+def _format_screening(file_name: str, result: dict) -> str:
+    summary = result["summary"]
+    lines = ["based on your input, here is the final summary \n", f"## Screening: {file_name} for {summary['role']}", f"Match: {summary['match_percentage']}%", ""]
+    if result.get("duplicate_of"):
+        duplicate_of = result["duplicate_of"]
+        lines.insert(3, f"Near-duplicate of {duplicate_of['file_name']} ({round(duplicate_of['similarity'] * 100)}% similar), the earlier screening was reused.")
+    for category, category_result in result["results"].items():
+        if not category_result["matched_skills"] and not category_result["missing_skills"]:
+            continue
+        lines.append(f"### {category.replace('_', ' ').title()}")
+        lines.append(f"- Matched ({len(category_result['matched_skills'])}): {', '.join(category_result['matched_skills']) or '-'}")
+        lines.append(f"- Missing ({len(category_result['missing_skills'])}): {', '.join(category_result['missing_skills']) or '-'}")
+    return "\n".join(lines)
+
+
+def _format_free_time(result: dict) -> str:
+    lines = ["based on your input, here is the final summary \n", f"## Free time for {result['interviewer']} ({result['week_start']} - {result['week_end']})"]
+    for slot in result["available_slots"]:
+        lines.append(f"- {slot['day']}: {slot['start'][11:16]} - {slot['end'][11:16]} ({slot['duration_minutes']} min)")
+    if not result["available_slots"]:
+        lines.append("No free slots left this week.")
+    return "\n".join(lines)
+
+
+def _screen(file_name: str, role: str) -> Optional[FastPathResult]:
+    read_arguments = {"file_name": file_name}
+    with timed("tool.read_resume_from_file"):
+        document = hrserver.read_resume_from_file(**read_arguments)
+    if "error" in document:
+        return None
+    screen_arguments = {"resume": document["handle"], "role": role}
+    with timed("tool.candidate_screening"):
+        result = hrserver.candidate_screening(**screen_arguments)
+    if "error" in result:
+        return None
+    return FastPathResult(
+        "screen",
+        _format_screening(file_name, result),
+        [(hrserver.read_resume_from_file, read_arguments, document), (hrserver.candidate_screening, screen_arguments, result)],
+    )
+
+
+def _free_time(email: str) -> Optional[FastPathResult]:
+    arguments = {"interviewer": email}
+    with timed("tool.get_interviewer_free_time"):
+        result = hrserver.get_interviewer_free_time(**arguments)
+    if "error" in result:
+        return None
+    return FastPathResult("free_time", _format_free_time(result), [(hrserver.get_interviewer_free_time, arguments, result)])
+
+
+def _match(message: str) -> Optional[FastPathResult]:
+    if _AMBIGUOUS_PATTERN.search(message):
+        return None
+
+    file_name = _find_file(message)
+    if file_name:
+        role = _find_role(message)
+        # an upload with a known role, or an explicit "screen <file> for <role>"
+        if role and (_UPLOAD_PATTERN.search(message) or _SCREEN_PATTERN.search(message)):
+            return _screen(file_name, role)
+        return None
+
+    match = next((match for pattern in _FREE_TIME_PATTERNS if (match := pattern.fullmatch(message.strip()))), None)
+    if match:
+        return _free_time(match.group("email"))
+    return None
+
+
+def route(message: str) -> Optional[FastPathResult]:
+    """
+    Answer the message without the LLM when it is a recognized command.
+    Returns None when the message should go to the LLM planner (unrecognized, ambiguous or a tool error).
+    """
+    try:
+        result = _match(message)
+    except Exception as e:
+        logger.warning("Fast path failed, falling back to the LLM", extra={"error": str(e)})
+        result = None
+
+    with _counts_lock:
+        if result is None:
+            _counts["llm"] += 1
+        else:
+            _counts["fast_path"] += 1
+            _intent_counts[result.intent] = _intent_counts.get(result.intent, 0) + 1
+    return result
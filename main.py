@@ -1,17 +1,30 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from auth.user_routes import router as user_router
 from index_routes import router as index_router
-from middleware import GlobalMiddleWare
+from candidate_routes import router as candidate_router
+from ingest_routes import router as ingest_router
+from middleware import TimingMiddleware
+from core.profiler import ProfilingMiddleware
+from core.log_utils import RequestIdMiddleware, setup_logging
+from core.static_files import CompressedStaticFiles
+from core.env.env_utils import get_settings
 from auth.db_handler import DatabaseHandler
+from hrmcpserver import hrserver
 from contextlib import asynccontextmanager
+import asyncio
 import os
 
+setup_logging()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await DatabaseHandler.connect_db()
+    # load OCR/PDF/Google dependencies in the background so startup is not blocked on them
+    warm_up_task = asyncio.create_task(asyncio.to_thread(hrserver.warm_up))
     yield
+    warm_up_task.cancel()
     await DatabaseHandler.close_db()
 
 app = FastAPI(lifespan=lifespan)
@@ -21,7 +34,12 @@ origins = [
     "http://127.0.0.1:8000"
 ]
 
-app.add_middleware(GlobalMiddleWare)    
+settings = get_settings()
+
+# compresses large JSON/NDJSON results; precompressed static files already carry a content-encoding and are skipped
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=settings.GZIP_LEVEL)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TimingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -29,6 +47,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost, so every log record of the request (including the other middlewares') has its id
+app.add_middleware(RequestIdMiddleware)
 
 UPLOAD_DIR = "./uploads/"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -36,9 +56,11 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 app.include_router(user_router)
 app.include_router(index_router)
+app.include_router(candidate_router)
+app.include_router(ingest_router)
+# after the routers, so the API routes take precedence over the catch-all mount
+app.mount("/", CompressedStaticFiles("static"), name="static")
 
 if __name__ == "__main__":
     import uvicorn
-    # Mount static files
-    app.mount("/", StaticFiles(directory="static", html=True), name="static")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,25 +1,49 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request, Response
+from fastapi import Request
 import jwt
 from fastapi import HTTPException
 from core.env.env_utils import get_settings
+from core.timing import end_request, server_timing, start_request, timed
 
 settings = get_settings()
 import time 
 
-class GlobalMiddleWare(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
+class TimingMiddleware:
+    """
+    Pure ASGI timing middleware: adds `X-Process-Time` and a `Server-Timing` header with the stages
+    recorded during the request (auth, llm, tool.<name>, db, ...) measured on a monotonic clock.
+    Streaming responses pass through unbuffered; their timings cover the work done before the headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start_time = time.perf_counter()
+        token = start_request()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start_time
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-process-time", f"{process_time:.6f}".encode()),
+                    (b"server-timing", server_timing(process_time).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(token)
 
 async def auth_middleware(request: Request):
-    token = request.headers.get("Authorization")
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=settings.ALGORITHM)
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=403, detail="Invalid authentication credentials")
\ No newline at end of file
+    with timed("auth"):
+        token = request.headers.get("Authorization")
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=settings.ALGORITHM)
+        except jwt.PyJWTError:
+            raise HTTPException(status_code=403, detail="Invalid authentication credentials")
+    return payload
@@ -1,61 +1,146 @@
-import requests
 import json
-import re
+import logging
+import time
 from typing import Dict, Optional
 
+logger = logging.getLogger(__name__)
+
 class OllamaExtractor:
     def __init__(self, base_url="http://localhost:11434"):
         self.base_url = base_url
     
-    def extract_data(self, prompt_text: str, model="phi3:mini"):
+    def extract_data(self, prompt_text: str, model="phi3:mini", schema: Optional[Dict] = None):
+        data, _ = self.extract_data_with_stats(prompt_text, model, schema)
+        return data
+
+    def extract_data_with_stats(self, prompt_text: str, model="phi3:mini", schema: Optional[Dict] = None):
+        """
+        Same as extract_data, also returning the prompt/eval token counts and latency reported by Ollama.
+        When a JSON schema is given, Ollama's structured output constrains the response to it.
+        """
+        import requests
+
+        payload = {
+            "model": model,
+            "prompt": prompt_text,
+            "stream": False,
+            "options": {"temperature": 0.0}
+        }
+        if schema is not None:
+            payload["format"] = schema
+
+        start = time.perf_counter()
+        response = requests.post(f"{self.base_url}/api/generate", json=payload)
+        body = response.json()
+        stats = {
+            "prompt_tokens": body.get("prompt_eval_count"),
+            "eval_tokens": body.get("eval_count"),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        return clean_json_response(body["response"]), stats
+
+    def embed(self, texts: list[str], model="nomic-embed-text", timeout: Optional[float] = None) -> list[list[float]]:
+        """
+        Embed a batch of texts in a single call to the Ollama embedding endpoint.
+        """
+        import requests
+
         response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt_text,
-                "stream": False,
-                "options": {"temperature": 0.0}
-            }
+            f"{self.base_url}/api/embed",
+            json={"model": model, "input": texts},
+            timeout=timeout
         )
-        
-        return clean_json_response(response.json()["response"])
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _json_candidates(text: str):
+    """
+    Yield every top-level JSON object/array in the text as a repaired string, in one pass:
+    trailing commas are dropped, single-quoted strings are converted to double quotes and a
+    candidate truncated by the end of the text is closed.
+    """
+    out = []
+    stack = []
+    quote = None
+    escaped = False
+    last_significant = -1
+    for char in text:
+        if not stack:
+            if char in _CLOSERS:
+                out = [char]
+                stack.append(_CLOSERS[char])
+                last_significant = 0
+            continue
+
+        if quote:
+            if escaped:
+                escaped = False
+                if char == "'":
+                    # \' is not a valid JSON escape, the quote needs none inside a double-quoted string
+                    out[-1] = ""
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+                char = '"'
+            elif char == '"':
+                # double quote inside a single-quoted string
+                char = '\\"'
+            out.append(char)
+            continue
+
+        if char in "\"'":
+            quote = char
+            char = '"'
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            if out[last_significant] == ",":
+                out[last_significant] = ""
+            if char != stack[-1]:
+                # mismatched closer, assume the model meant to close the innermost container
+                char = stack[-1]
+            stack.pop()
+        elif char.isspace():
+            out.append(char)
+            continue
+
+        out.append(char)
+        last_significant = len(out) - 1
+        if not stack:
+            yield "".join(out)
+
+    if stack:
+        if quote:
+            out.append('"')
+        elif out[last_significant] in ",:":
+            out[last_significant] = ""
+        yield "".join(out) + "".join(reversed(stack))
 
 
 def clean_json_response(response_text):
     """
-    Clean and parse JSON from Ollama response
+    Clean and parse JSON from Ollama response.
+
+    Returns the first JSON object or list found in the text, or the original text if none can be parsed.
     """
-    # Remove any code block markers
-    cleaned = re.sub(r'```json\s*', '', response_text)
-    cleaned = re.sub(r'\s*```', '', cleaned)
-    
-    # Remove any text before or after JSON
-    json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-    if json_match:
-        cleaned = json_match.group(0)
-    
-    # Clean common JSON issues
-    cleaned = cleaned.replace('0.5,', '')  # Remove malformed line
-    cleaned = cleaned.strip()
-    
-    decoder = json.JSONDecoder()
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        # Try to fix trailing commas first
-        cleaned = re.sub(r',\s*}', '}', cleaned)
-        cleaned = re.sub(r',\s*]', ']', cleaned)
+        parsed = json.loads(response_text)
+        # a bare number, string or null is not an answer, look for an object/list in the text instead
+        if isinstance(parsed, (dict, list)):
+            return parsed
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    for candidate in _json_candidates(response_text or ""):
         try:
-            return json.loads(cleaned)
+            return json.loads(candidate)
         except json.JSONDecodeError:
-            # Attempt to locate the first JSON object inside the text
-            for match in re.finditer(r'\{', cleaned):
-                start = match.start()
-                try:
-                    obj, _ = decoder.raw_decode(cleaned[start:])
-                    return obj
-                except json.JSONDecodeError:
-                    continue
-            print("JSON parse error: Could not parse response")
-            print(f"Raw response: {response_text=}")
-            return response_text
\ No newline at end of file
+            continue
+    logger.warning("JSON parse error: could not parse response", extra={"response_chars": len(response_text or "")})
+    logger.debug("Unparsed response", extra={"response": response_text})
+    return response_text
@@ -0,0 +1,180 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from core.env.env_utils import get_settings
+from hrmcpserver import hrserver
+from ollama_extractor import OllamaExtractor
+
+"""
+ per-user cache of chat answers. questions are keyed on their normalized text, near-duplicates are found
+ by embedding similarity, but only between questions naming the same entities (emails, file names, numbers,
+ roles) so "free slots for alice@..." never answers "free slots for bob@...". only answers computed by successful tool
+ calls are cached, they expire by the tools they depended on, calendar-derived answers are dropped when an
+ interview is scheduled and screening answers when a resume is registered or screened again.
+"""
+
+logger = logging.getLogger(__name__)
+
+# tools whose result reads the interviewer calendars
+CALENDAR_TOOLS = {"get_interviewer_free_time"}
+# answers produced by tools with side effects are never cached
+UNCACHEABLE_TOOLS = {"schedule_interview"}
+# tools whose answer changes when a resume is uploaded again or screened again
+SCREENING_TOOLS = {"read_resume_from_file", "candidate_screening"}
+
+_ENTITY_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+|[\w\-./()]+?\.(?:pdf|png|jpe?g)\b|\d+", re.IGNORECASE)
+_NON_WORD_PATTERN = re.compile(r"[^\w@.+\-]+")
+# questions asking for an action are always sent to the agent
+_ACTION_PATTERN = re.compile(r"\b(?:schedule|book|invite)\b", re.IGNORECASE)
+
+
+def normalize_question(message: str) -> str:
+    """
+    Lower-case the question and collapse punctuation and whitespace, keeping emails and file names intact.
+    """
+    return _NON_WORD_PATTERN.sub(" ", message.lower()).strip(" .")
+
+
+def question_entities(message: str) -> frozenset:
+    lowered = message.lower()
+    entities = {match for match in _ENTITY_PATTERN.findall(lowered)}
+    entities.update(role["role"].lower() for role in hrserver.load_hr_skills() if role["role"].lower() in lowered)
+    return frozenset(entities)
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries_per_user: int = 100, max_embeddings: int = 1000, extractor: Optional[OllamaExtractor] = None):
+        self.max_entries_per_user = max_entries_per_user
+        self.max_embeddings = max_embeddings
+        self.extractor = extractor or OllamaExtractor()
+        self._entries: dict[str, OrderedDict] = {}
+        self._embeddings: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "semantic_hits": 0, "misses": 0, "invalidated": 0}
+
+    def _ttl(self, tools: Iterable[str]) -> float:
+        settings = get_settings()
+        if CALENDAR_TOOLS.intersection(tools):
+            return settings.RESPONSE_CACHE_CALENDAR_TTL
+        return settings.RESPONSE_CACHE_TTL
+
+    def _embed(self, key: str):
+        """
+        Return the normalized embedding of a question, or None when the embedding model is unavailable or
+        does not answer within EMBEDDING_TIMEOUT (the lookup is then a miss).
+        """
+        import numpy as np
+
+        with self._lock:
+            if key in self._embeddings:
+                self._embeddings.move_to_end(key)
+                return self._embeddings[key]
+        try:
+            settings = get_settings()
+            vector = np.asarray(self.extractor.embed([key], settings.EMBEDDING_MODEL, timeout=settings.EMBEDDING_TIMEOUT)[0], dtype=np.float32)
+        except Exception as e:
+            logger.warning("Response cache embedding failed", extra={"error": str(e)})
+            return None
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+        with self._lock:
+            self._embeddings[key] = vector
+            while len(self._embeddings) > self.max_embeddings:
+                self._embeddings.popitem(last=False)
+        return vector
+
+    def _live_entries(self, user: str) -> OrderedDict:
+        entries = self._entries.get(user, OrderedDict())
+        now = time.monotonic()
+        for key in [key for key, entry in entries.items() if entry["expires_at"] <= now]:
+            del entries[key]
+        return entries
+
+    def get(self, user: str, message: str) -> Optional[str]:
+        """
+        Return the cached answer to the same or a near-identical question asked by this user.
+        """
+        if _ACTION_PATTERN.search(message):
+            return None
+        key = normalize_question(message)
+        entities = question_entities(message)
+        with self._lock:
+            entries = self._live_entries(user)
+            entry = entries.get(key)
+            if entry:
+                entries.move_to_end(key)
+                self._counts["hits"] += 1
+                return entry["text"]
+            candidates = [(other, entry) for other, entry in entries.items() if entry["entities"] == entities]
+        if not candidates:
+            with self._lock:
+                self._counts["misses"] += 1
+            return None
+
+        import numpy as np
+
+        vector = self._embed(key)
+        if vector is not None:
+            candidates = [(other, entry) for other, entry in candidates if entry["embedding"] is not None]
+            if candidates:
+                scores = np.stack([entry["embedding"] for _, entry in candidates]) @ vector
+                best = int(scores.argmax())
+                if scores[best] >= get_settings().RESPONSE_CACHE_SIMILARITY:
+                    with self._lock:
+                        self._counts["semantic_hits"] += 1
+                    return candidates[best][1]["text"]
+        with self._lock:
+            self._counts["misses"] += 1
+        return None
+
+    def put(self, user: str, message: str, text: str, tools: Iterable[str] = ()):
+        """
+        Cache an answer, expiring it by the tools it was computed with.
+        """
+        tools = set(tools)
+        if not text or UNCACHEABLE_TOOLS.intersection(tools):
+            return
+        key = normalize_question(message)
+        entities = question_entities(message)
+        embedding = self._embed(key)
+        with self._lock:
+            entries = self._entries.setdefault(user, OrderedDict())
+            entries[key] = {
+                "text": text,
+                "tools": tools,
+                "entities": entities,
+                "embedding": embedding,
+                "expires_at": time.monotonic() + self._ttl(tools),
+            }
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries_per_user:
+                entries.popitem(last=False)
+
+    def invalidate(self, tools: Iterable[str]):
+        """
+        Drop the answers of every user that depended on any of the given tools.
+        """
+        tools = set(tools)
+        with self._lock:
+            for entries in self._entries.values():
+                for key in [key for key, entry in entries.items() if tools & entry["tools"]]:
+                    del entries[key]
+                    self._counts["invalidated"] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["semantic_hits"] + self._counts["misses"]
+            hits = self._counts["hits"] + self._counts["semantic_hits"]
+            return {
+                **self._counts,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": sum(len(entries) for entries in self._entries.values()),
+            }
+
+
+response_cache = ResponseCache()
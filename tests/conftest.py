@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# settings required by core.env.env_utils, the tests never connect to them
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_NAME", "hrmcp_test")
+os.environ.setdefault("USER", "users")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,134 @@
+import datetime
+
+import pytest
+
+from hrmcpserver.calendar_fake import FakeCalendarService
+from hrmcpserver.calendar_store import CalendarEventStore, free_slots
+
+MONDAY = datetime.datetime(2026, 10, 19, tzinfo=datetime.timezone.utc)
+
+
+def _event(summary: str, day: int, start_hour: int, end_hour: int) -> dict:
+    start = MONDAY + datetime.timedelta(days=day, hours=start_hour)
+    end = MONDAY + datetime.timedelta(days=day, hours=end_hour)
+    return {"summary": summary, "start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+
+
+def _insert(service: FakeCalendarService, *events: dict) -> list[str]:
+    return [service.events().insert(calendarId="primary", body=event).execute()["id"] for event in events]
+
+
+@pytest.fixture
+def service():
+    # a small page size so syncs go through the pagination
+    return FakeCalendarService(page_size=2)
+
+
+@pytest.fixture
+def store(service, tmp_path):
+    return CalendarEventStore("primary", lambda: service, min_sync_interval=0, cache_dir=tmp_path)
+
+
+def _summaries(store: CalendarEventStore) -> list:
+    return sorted(event["summary"] for event in store._events.values())
+
+
+def test_initial_full_sync(service, store):
+    _insert(service, _event("standup", 0, 9, 10), _event("review", 1, 13, 14), _event("1:1", 2, 15, 16))
+
+    store.sync()
+
+    assert _summaries(store) == ["1:1", "review", "standup"]
+    assert all(call["syncToken"] is None for call in service.list_calls)
+    assert store.metrics()["full_syncs"] == 1
+    assert store.sync_token is not None
+
+
+def test_incremental_sync_fetches_only_changes(service, store):
+    standup, review, _ = _insert(service, _event("standup", 0, 9, 10), _event("review", 1, 13, 14), _event("1:1", 2, 15, 16))
+    store.sync()
+    token = store.sync_token
+    service.list_calls.clear()
+
+    _insert(service, _event("interview", 3, 10, 11))
+    service.events().patch(calendarId="primary", eventId=review, body={"summary": "design review"}).execute()
+    service.events().delete(calendarId="primary", eventId=standup).execute()
+    store.sync()
+
+    assert service.list_calls[0]["syncToken"] == token
+    assert _summaries(store) == ["1:1", "design review", "interview"]
+    metrics = store.metrics()
+    assert (metrics["full_syncs"], metrics["incremental_syncs"]) == (1, 1)
+    # 3 events listed by the full sync, 3 changes by the incremental one
+    assert metrics["changed_events"] == 6
+
+
+def test_expired_sync_token_falls_back_to_full_sync(service, store):
+    _, review = _insert(service, _event("standup", 0, 9, 10), _event("review", 1, 13, 14))
+    store.sync()
+    service.events().delete(calendarId="primary", eventId=review).execute()
+    service.expire_sync_tokens()
+    service.list_calls.clear()
+
+    store.sync()
+
+    # the incremental list got 410 Gone, then a full list without a token
+    assert service.list_calls[0]["syncToken"] is not None
+    assert service.list_calls[1]["syncToken"] is None
+    assert _summaries(store) == ["standup"]
+    assert store.metrics()["full_syncs"] == 2
+
+
+def test_sync_state_survives_a_restart(service, store, tmp_path):
+    _insert(service, _event("standup", 0, 9, 10))
+    store.sync()
+    _insert(service, _event("review", 1, 13, 14))
+
+    restarted = CalendarEventStore("primary", lambda: service, min_sync_interval=0, cache_dir=tmp_path)
+    service.list_calls.clear()
+    restarted.sync()
+
+    assert service.list_calls[0]["syncToken"] == store.sync_token
+    assert _summaries(restarted) == ["review", "standup"]
+    assert restarted.metrics()["full_syncs"] == 0
+
+
+def test_free_slots_from_the_local_copy(service, store):
+    _insert(service, _event("standup", 0, 9, 10), _event("lunch", 0, 12, 13), _event("next day", 1, 9, 17))
+    store.sync()
+
+    day_end = MONDAY + datetime.timedelta(days=1)
+    slots = free_slots(store.busy_intervals(MONDAY, day_end), MONDAY, day_end)
+
+    assert [(slot["start"][11:16], slot["end"][11:16]) for slot in slots] == [("10:00", "12:00"), ("13:00", "17:00")]
+
+
+def test_calendar_client_per_thread(monkeypatch):
+    import sys
+    import threading
+    import types
+
+    from hrmcpserver.calendar_service import CalendarService
+
+    built = []
+
+    def build(name, version, credentials, cache_discovery=True):
+        service = object()
+        built.append((credentials, service))
+        return service
+
+    monkeypatch.setitem(sys.modules, "googleapiclient", types.ModuleType("googleapiclient"))
+    monkeypatch.setitem(sys.modules, "googleapiclient.discovery", types.SimpleNamespace(build=build))
+    monkeypatch.setattr(CalendarService, "_get_credentials", staticmethod(lambda: "credentials"))
+    monkeypatch.setattr(CalendarService, "_credentials", None)
+    monkeypatch.setattr(CalendarService, "_local", threading.local())
+
+    main_service = CalendarService._get_service()
+    assert CalendarService._get_service() is main_service
+    other = []
+    thread = threading.Thread(target=lambda: other.append(CalendarService._get_service()))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not main_service
+    assert [credentials for credentials, _ in built] == ["credentials", "credentials"]
@@ -0,0 +1,135 @@
+import asyncio
+import csv
+import io
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import candidate_routes
+from middleware import auth_middleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(candidate_routes.router)
+    app.dependency_overrides[auth_middleware] = lambda: {"sub": "recruiter"}
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("k", [0, -1, candidate_routes.MAX_K + 1])
+def test_rescore_rejects_invalid_k(client, k):
+    response = client.post("/candidates/rescore", json={"role": "flutter developer", "k": k})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("k", [0, -1, candidate_routes.MAX_K + 1])
+def test_search_rejects_invalid_k(client, k):
+    response = client.get("/candidates/search", params={"skills": "go", "k": k})
+    assert response.status_code == 422
+
+
+def test_search_normalizes_like_the_stored_terms(client, monkeypatch):
+    calls = []
+
+    async def search_candidates(skills, k, role):
+        calls.append(skills)
+        return []
+
+    monkeypatch.setattr(candidate_routes.DatabaseHandler, "search_candidates", search_candidates)
+    response = client.get("/candidates/search", params={"skills": "Unit testing with Jasmine, golang,go"})
+    assert response.status_code == 200
+    assert calls == [["unit testing jasmine", "go"]]
+
+
+def test_rescore_reads_only_candidates_with_a_role_term(client, monkeypatch):
+    queried = []
+
+    async def iter_candidate_skills(skills, batch_size=1000):
+        queried.append(set(skills))
+        yield {"_id": "1", "file_name": "a.pdf", "role": "flutter developer", "skills": ["riverpod", "getx"]}
+        yield {"_id": "2", "file_name": "b.pdf", "role": "flutter developer", "skills": ["riverpod"]}
+
+    monkeypatch.setattr(candidate_routes.DatabaseHandler, "iter_candidate_skills", iter_candidate_skills)
+    response = client.post("/candidates/rescore", json={"role": "flutter developer", "k": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert {"riverpod", "getx"} <= queried[0]
+    assert body["scored"] == 2
+    assert [candidate["_id"] for candidate in body["candidates"]] == ["1"]
+
+
+class FakeCursor:
+    def __init__(self, count):
+        self.count = count
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read == self.count:
+            raise StopAsyncIteration
+        self.read += 1
+        return {"_id": str(self.read), "file_name": f"cv{self.read}.pdf", "role": "go developer", "match_percentage": 50.0}
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _collect(rows, limit=None):
+    async def collect():
+        chunks = []
+        async for chunk in rows:
+            chunks.append(chunk)
+            if len(chunks) == limit:
+                await rows.aclose()
+                break
+        return chunks
+    return asyncio.run(collect())
+
+
+def test_export_is_chunked_and_closes_the_cursor():
+    cursor = FakeCursor(2 * candidate_routes.EXPORT_CHUNK_ROWS + 1)
+    chunks = _collect(candidate_routes._export_rows(cursor, "ndjson"))
+    assert [chunk.count("\n") for chunk in chunks] == [candidate_routes.EXPORT_CHUNK_ROWS, candidate_routes.EXPORT_CHUNK_ROWS, 1]
+    assert cursor.closed
+
+
+def test_abandoned_export_closes_the_cursor():
+    cursor = FakeCursor(10 * candidate_routes.EXPORT_CHUNK_ROWS)
+    _collect(candidate_routes._export_rows(cursor, "csv"), limit=1)
+    assert cursor.read == candidate_routes.EXPORT_CHUNK_ROWS
+    assert cursor.closed
+
+
+@pytest.mark.parametrize("value", ["=HYPERLINK(\"x\")", "+1", "-1", "@SUM(A1)"])
+def test_csv_cells_starting_a_formula_are_escaped(value):
+    row = candidate_routes._csv_row({"_id": "1", "file_name": value})
+    assert row[1] == "'" + value
+
+
+def test_csv_export_rows():
+    created_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    candidate = {
+        "_id": "1", "file_name": "cv.pdf", "role": "go developer", "match_percentage": 75.0,
+        "results": {"technical_skills": {"matched_skills": ["Go", "Docker"], "missing_skills": ["Rust"]}},
+        "skills": ["go", "docker"], "created_at": created_at,
+    }
+    (chunk,) = _collect(candidate_routes._export_rows(_aiter([candidate]), "csv"))
+    header, row = list(csv.reader(io.StringIO(chunk)))
+    assert header == candidate_routes.EXPORT_COLUMNS
+    assert dict(zip(header, row)) == {
+        **dict.fromkeys(header, ""),
+        "id": "1", "file_name": "cv.pdf", "role": "go developer", "match_percentage": "75.0",
+        "matched_technical_skills": "Go; Docker", "missing_technical_skills": "Rust",
+        "skills": "go; docker", "created_at": created_at.isoformat(),
+    }
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from auth import db_handler
+from auth.db_handler import DatabaseHandler
+
+
+def test_index_creation_does_not_block_startup_and_failures_are_logged(monkeypatch, caplog):
+    async def ensure_candidate_indexes():
+        await asyncio.sleep(0)
+        raise RuntimeError("server unreachable")
+
+    class FakeClient:
+        def __init__(self, url):
+            self.url = url
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(db_handler, "AsyncIOMotorClient", FakeClient)
+    monkeypatch.setattr(DatabaseHandler, "client", None)
+    monkeypatch.setattr(DatabaseHandler, "index_task", None)
+    monkeypatch.setattr(DatabaseHandler, "ensure_candidate_indexes", ensure_candidate_indexes)
+
+    async def startup():
+        await DatabaseHandler.connect_db()
+        assert not DatabaseHandler.index_task.done()
+        await asyncio.gather(DatabaseHandler.index_task, return_exceptions=True)
+        await asyncio.sleep(0)
+        await DatabaseHandler.close_db()
+
+    with caplog.at_level(logging.ERROR, logger=db_handler.__name__):
+        asyncio.run(startup())
+    assert "Could not create the candidate indexes" in caplog.text
@@ -0,0 +1,21 @@
+from hrmcpserver import hrserver
+from hrmcpserver.document_store import DocumentStore
+
+
+def test_resolve_returns_text_for_known_handle():
+    store = DocumentStore()
+    handle = store.put("Flutter developer with Dart", "cv.pdf")
+    assert store.resolve(handle) == "Flutter developer with Dart"
+
+
+def test_resolve_returns_plain_text_unchanged():
+    assert DocumentStore().resolve("Flutter developer with Dart") == "Flutter developer with Dart"
+
+
+def test_resolve_signals_unknown_handle():
+    assert DocumentStore().resolve("doc_0123456789") is None
+
+
+def test_screening_rejects_unknown_handle():
+    result = hrserver.candidate_screening("doc_0123456789", "flutter developer")
+    assert result["error"].startswith("Unknown or expired resume handle")
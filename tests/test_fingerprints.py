@@ -0,0 +1,33 @@
+import pytest
+
+from hrmcpserver import fingerprints, hrserver
+from hrmcpserver.document_store import DocumentStore
+
+RESUME = (
+    "Senior Flutter developer with six years of experience building cross platform mobile apps in Dart, "
+    "state management with Bloc and Riverpod, REST and GraphQL integrations, CI pipelines on GitHub Actions "
+    "and release automation for the App Store and Google Play."
+)
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = fingerprints.FingerprintIndex(tmp_path / "fingerprints.sqlite3")
+    monkeypatch.setattr(fingerprints, "_index", index)
+    monkeypatch.setattr(hrserver, "document_store", DocumentStore())
+    return index
+
+
+def test_near_duplicate_is_flagged(index):
+    hrserver.register_document(RESUME, "first.pdf")
+    summary = hrserver.register_document(RESUME + " References available on request.", "second.pdf")
+    assert summary["duplicate_of"]["file_name"] == "first.pdf"
+
+
+@pytest.mark.parametrize("text", ["", "   \n\t ", "Page 1"])
+def test_blank_extractions_are_not_duplicates(index, text):
+    # failed OCR returns "", every such file used to be a duplicate of the first one
+    hrserver.register_document(text, "blank1.png")
+    summary = hrserver.register_document(text, "blank2.png")
+    assert not summary.get("duplicate_of")
+    assert index.count() == 0
@@ -0,0 +1,56 @@
+import pytest
+
+from hrmcpserver import hrserver
+
+
+def test_image_buffers_reach_the_ocr_as_bytes(monkeypatch):
+    calls = []
+
+    def extract_text_from_image(image_source, file_name=None):
+        calls.append((type(image_source), bytes(image_source), file_name))
+        return " text "
+
+    monkeypatch.setattr(hrserver, "extract_text_from_image", extract_text_from_image)
+    assert hrserver.extract_text_from_bytes(memoryview(b"png data"), "CV.PNG") == "text"
+    assert calls == [(bytes, b"png data", "CV.PNG")]
+
+
+def _pdf(pages):
+    import pymupdf
+
+    doc = pymupdf.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Kuber-\nnetes and Go", "Kubernetes and Go"),
+    ("Kuber- \n  netes", "Kubernetes"),
+    ("self-taught   engineer", "self-taught engineer"),
+    ("line one\n\n\n  line two\t\tend", "line one\nline two end"),
+    ("2019 -\n2021", "2019 -\n2021"),
+    ("  padded \n", "padded"),
+])
+def test_normalize_text(text, expected):
+    assert hrserver.normalize_text(text) == expected
+
+
+def test_pdf_page_budget():
+    pdf = _pdf(["page one", "page two", "page three"])
+    assert hrserver.__extract_text_from_pdf(pdf, max_pages=2, max_chars=0) == "page one\npage two"
+    assert hrserver.__extract_text_from_pdf(pdf, max_pages=0, max_chars=0) == "page one\npage two\npage three"
+
+
+def test_pdf_character_budget_stops_mid_page():
+    pdf = _pdf(["page one", "page two", "page three"])
+    assert hrserver.__extract_text_from_pdf(pdf, max_pages=0, max_chars=12) == "page one\npage"
+    # the budget is spent exactly at the end of a page, the next one is not read
+    assert hrserver.__extract_text_from_pdf(pdf, max_pages=0, max_chars=8) == "page one"
+
+
+def test_pdf_from_a_memoryview():
+    pdf = _pdf(["page one"])
+    assert hrserver.extract_text_from_bytes(memoryview(pdf), "cv.pdf") == "page one"
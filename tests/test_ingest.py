@@ -0,0 +1,113 @@
+import io
+import threading
+import time
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+import ingest_routes
+from hrmcpserver import hrserver
+from ingest_routes import MB, IngestLimits, ingest_events, iter_upload_entries
+
+
+def _zip(entries: dict, encrypted: tuple = ()) -> UploadFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+        offsets = {info.filename: info.header_offset for info in archive.infolist()}
+    raw = bytearray(buffer.getvalue())
+    for name in encrypted:
+        # zipfile cannot write encrypted entries: set the "encrypted" flag bit in the local header
+        # (general purpose flags at offset 6) and in the central directory header (offset 8)
+        raw[offsets[name] + 6] |= 1
+        central = raw.index(b"PK\x01\x02")
+        while raw[central + 46:central + 46 + len(name)] != name.encode():
+            central = raw.index(b"PK\x01\x02", central + 4)
+        raw[central + 8] |= 1
+    return UploadFile(io.BytesIO(bytes(raw)), filename="export.zip")
+
+
+def _file(name: str, data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=name)
+
+
+def _limits(max_entries=100, max_total_mb=10, max_file_mb=1) -> IngestLimits:
+    return IngestLimits(max_entries, max_total_mb * MB, max_file_mb * MB)
+
+
+@pytest.fixture
+def extracted(monkeypatch, tmp_path):
+    """
+    Extraction and registration stubs; `delays` slows down the extraction of a file by name.
+    """
+    delays = {}
+
+    def extract_text_from_bytes(data, file_name):
+        time.sleep(delays.get(file_name.split("_", 1)[1], 0))
+        return bytes(data).decode()
+
+    monkeypatch.setattr(ingest_routes, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(hrserver, "extract_text_from_bytes", extract_text_from_bytes)
+    monkeypatch.setattr(hrserver, "register_document", lambda text, file_name: {"handle": "doc_0123456789", "chars": len(text)})
+    return delays
+
+
+def test_file_and_total_size_limits():
+    limits = _limits(max_total_mb=2, max_file_mb=1)
+    entries = list(iter_upload_entries([_file("a.pdf", b"x" * (MB + 1)), _file("b.pdf", b"x" * MB), _file("c.pdf", b"x" * MB), _file("d.pdf", b"x")], limits))
+    assert [isinstance(data, ValueError) for _, data in entries] == [True, False, False, True]
+
+
+def test_zip_bomb_entry_is_not_read_past_the_file_limit():
+    # 20 MB of zeros compress to a few KB
+    archive = _zip({"bomb.pdf": b"\0" * (20 * MB), "cv.pdf": b"resume"})
+    entries = dict(iter_upload_entries([archive], _limits(max_file_mb=1)))
+    assert isinstance(entries["bomb.pdf"], ValueError)
+    assert entries["cv.pdf"] == b"resume"
+
+
+def test_encrypted_entry_is_skipped():
+    archive = _zip({"secret.pdf": b"classified", "cv.pdf": b"resume"}, encrypted=("secret.pdf",))
+    entries = dict(iter_upload_entries([archive], _limits()))
+    assert str(entries["secret.pdf"]) == "Encrypted entry, password required"
+    assert entries["cv.pdf"] == b"resume"
+
+
+def test_entry_cap_stops_reading_the_archive(monkeypatch):
+    opened = []
+    original_open = zipfile.ZipFile.open
+
+    def counting_open(self, name, *args, **kwargs):
+        opened.append(name)
+        return original_open(self, name, *args, **kwargs)
+
+    archive = _zip({f"cv{i}.pdf": b"resume" for i in range(50)})
+    monkeypatch.setattr(zipfile.ZipFile, "open", counting_open)
+
+    entries = list(iter_upload_entries([archive, _file("late.pdf", b"resume")], _limits(max_entries=3)))
+
+    assert len(opened) == 3
+    assert [name for name, _ in entries] == ["cv0.pdf", "cv1.pdf", "cv2.pdf", "cv3.pdf"]
+    assert "not read" in str(entries[-1][1])
+
+
+def test_same_base_name_in_different_folders(extracted, tmp_path):
+    archive = _zip({"a/cv.pdf": b"first resume", "b/cv.pdf": b"second resume"})
+    events = list(ingest_events([archive], _limits(), workers=2))
+
+    stored = {event["file_name"]: event["stored_as"] for event in events if event.get("status") == "ok"}
+    assert set(stored) == {"a/cv.pdf", "b/cv.pdf"}
+    assert {(tmp_path / name).read_bytes() for name in stored.values()} == {b"first resume", b"second resume"}
+
+
+def test_events_come_in_upload_order(extracted):
+    extracted["slow.pdf"] = 0.2
+    files = [_file("slow.pdf", b"slow"), _file("notes.txt", b"skip me"), _file("fast.pdf", b"fast")]
+
+    events = list(ingest_events(files, _limits(), workers=4))
+
+    assert [event.get("file_name") for event in events[:-1]] == ["slow.pdf", "notes.txt", "fast.pdf"]
+    assert [event["status"] for event in events] == ["ok", "skipped", "ok", "done"]
+    assert (events[-1]["ok"], events[-1]["skipped"]) == (2, 1)
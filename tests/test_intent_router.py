@@ -0,0 +1,47 @@
+import pytest
+
+import intent_router
+from hrmcpserver import hrserver
+
+FREE_TIME = {
+    "interviewer": "alice@example.com",
+    "week_start": "2026-10-19",
+    "week_end": "2026-10-23",
+    "available_slots": [],
+}
+
+
+@pytest.fixture
+def calendar_calls(monkeypatch):
+    calls = []
+
+    def get_interviewer_free_time(interviewer, start_date=None, end_date=None):
+        calls.append(interviewer)
+        return dict(FREE_TIME, interviewer=interviewer)
+
+    monkeypatch.setattr(hrserver, "get_interviewer_free_time", get_interviewer_free_time)
+    return calls
+
+
+@pytest.mark.parametrize("message", [
+    "free time for alice@example.com",
+    "Check availability of alice@example.com?",
+    "show me the free slots for alice@example.com",
+    "when is alice@example.com free?",
+])
+def test_free_time_commands_use_the_fast_path(calendar_calls, message):
+    result = intent_router.route(message)
+    assert result is not None and result.intent == "free_time"
+    assert calendar_calls == ["alice@example.com"]
+
+
+@pytest.mark.parametrize("message", [
+    "Please email alice@example.com, feel free to ask",
+    "what are the available roles? contact hr@x.com",
+    "is alice@example.com free on Friday after the standup, and who else is available?",
+    "free time for alice@example.com and bob@example.com",
+    "schedule an interview at the first free slot for alice@example.com",
+])
+def test_other_messages_with_an_email_go_to_the_llm(calendar_calls, message):
+    assert intent_router.route(message) is None
+    assert calendar_calls == []
@@ -0,0 +1,80 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from core import log_utils
+from core.env.env_utils import get_settings
+
+
+def _record(msg="Resume parsed", args=None, **extra):
+    record = logging.LogRecord("hrmcpserver.hrserver", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_emits_extra_fields():
+    line = log_utils.JsonFormatter().format(_record("Parsed %s", ("cv.pdf",), pages=2, request_id="abc"))
+    entry = json.loads(line)
+    assert entry["msg"] == "Parsed cv.pdf"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "hrmcpserver.hrserver"
+    assert entry["request_id"] == "abc"
+    assert entry["pages"] == 2
+    assert "args" not in entry and "lineno" not in entry
+
+
+def test_json_formatter_redacts_secrets():
+    record = _record("login with password=hunter2", api_key="k-123", headers={"Authorization": "Bearer abc", "accept": "json"})
+    entry = json.loads(log_utils.JsonFormatter().format(record))
+    assert entry["msg"] == "login with password=***"
+    assert entry["api_key"] == log_utils.REDACTED
+    assert entry["headers"] == {"Authorization": log_utils.REDACTED, "accept": "json"}
+
+
+def test_json_formatter_includes_the_exception():
+    try:
+        raise ValueError("bad resume")
+    except ValueError:
+        record = _record()
+        record.exc_info = sys.exc_info()
+    assert "ValueError: bad resume" in json.loads(log_utils.JsonFormatter().format(record))["exc"]
+
+
+def test_context_filter_attaches_the_request_id_and_samples():
+    token = log_utils.request_id_var.set("req-1")
+    try:
+        record = _record()
+        assert log_utils.ContextFilter(1.0).filter(record)
+        assert record.request_id == "req-1"
+    finally:
+        log_utils.request_id_var.reset(token)
+    assert not log_utils.ContextFilter(0.0).filter(_record(sampled=True))
+    assert log_utils.ContextFilter(0.0).filter(_record())
+
+
+@pytest.fixture
+def queued_logging(monkeypatch):
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    monkeypatch.setattr(log_utils, "_listener", None)
+    monkeypatch.setattr(get_settings(), "LOG_FORMAT", "json")
+    yield
+    log_utils.shutdown_logging()
+    root.handlers, root.level = handlers, level
+
+
+def test_queued_records_are_written_on_shutdown(queued_logging, capsys):
+    log_utils.setup_logging()
+    log_utils.setup_logging()
+    assert len(logging.getLogger().handlers) == 1
+    for number in range(100):
+        logging.getLogger("ingest").info("File ingested", extra={"number": number})
+    # also registered with atexit: drains the queue before returning
+    log_utils.shutdown_logging()
+    log_utils.shutdown_logging()
+    entries = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [entry["number"] for entry in entries] == list(range(100))
+    assert {entry["request_id"] for entry in entries} == {"-"}
@@ -0,0 +1,215 @@
+import logging
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from hrmcpserver import ocr
+
+
+def test_unreadable_image_logs_the_file_name(caplog):
+    with caplog.at_level(logging.ERROR, logger=ocr.__name__):
+        assert ocr.extract_text_from_image(b"not an image", file_name="cv.png") == ""
+    (record,) = caplog.records
+    assert record.file_name == "cv.png"
+
+
+def test_image_path_logs_its_name(tmp_path, caplog):
+    path = tmp_path / "scan.jpg"
+    path.write_bytes(b"not an image")
+    with caplog.at_level(logging.ERROR, logger=ocr.__name__):
+        assert ocr.extract_text_from_image(path) == ""
+    assert caplog.records[0].file_name == "scan.jpg"
+
+
+def _page(height=200, width=300, background=220, ink=30):
+    page = np.full((height, width), background, dtype=np.uint8)
+    # three text lines 24px tall
+    for top in (20, 80, 140):
+        page[top:top + 24, 20:280:3] = ink
+    return page
+
+
+def test_otsu_threshold_separates_the_two_modes():
+    gray = np.concatenate([np.full(1000, 40, np.uint8), np.full(3000, 200, np.uint8)])
+    threshold = ocr.otsu_threshold(gray)
+    assert 40 < threshold <= 200
+    assert (gray < threshold).sum() == 1000
+
+
+def test_otsu_threshold_on_noisy_page():
+    rng = np.random.default_rng(0)
+    page = _page().astype(np.int16) + rng.integers(-15, 15, size=(200, 300))
+    page = np.clip(page, 0, 255).astype(np.uint8)
+    ink = page < ocr.otsu_threshold(page)
+    assert (ink == (_page() < 100)).all()
+
+
+def test_adaptive_threshold_matches_the_local_means():
+    rng = np.random.default_rng(1)
+    gray = rng.integers(0, 256, size=(23, 17), dtype=np.uint8)
+    block_size, offset = 7, 5
+    half = block_size // 2
+    padded = np.pad(gray.astype(np.float64), half + 1, mode="edge")
+    expected = np.zeros(gray.shape, dtype=bool)
+    for y in range(gray.shape[0]):
+        for x in range(gray.shape[1]):
+            # the window of the integral image, shifted by the extra padding row/column
+            window = padded[y + 1:y + 1 + block_size, x + 1:x + 1 + block_size]
+            expected[y, x] = gray[y, x] < window.mean() - offset
+    assert (ocr.adaptive_threshold(gray, block_size, offset) == expected).all()
+
+
+def test_adaptive_threshold_handles_uneven_lighting():
+    # background fading from white to dark grey, darker ink everywhere
+    page = _page().astype(np.int16)
+    page -= np.linspace(0, 150, page.shape[1]).astype(np.int16)
+    page = np.clip(page, 0, 255).astype(np.uint8)
+    ink = ocr.adaptive_threshold(page)
+    text = _page() < 100
+    assert ink[text].mean() > 0.9
+    assert ink[~text].mean() < 0.05
+    # a global threshold loses one side of the page
+    global_ink = page < ocr.otsu_threshold(page)
+    assert global_ink[~text].mean() > 0.05
+
+
+def test_line_height():
+    assert ocr.estimate_line_height(_page() < 100) == 24
+    assert ocr.estimate_line_height(np.zeros((10, 10), bool)) is None
+
+
+def test_prepare_image_inverts_light_text_and_upscales_small_lines():
+    # light text on a dark background, 12px lines
+    small = Image.fromarray(255 - _page()[::2, ::2])
+    prepared = np.asarray(ocr.prepare_image_for_ocr(small))
+    assert set(np.unique(prepared)) <= {0, 255}
+    assert prepared.shape[0] > small.height
+    # white background, black text
+    assert (prepared == 255).mean() > 0.5
+
+
+class StubEngine:
+    def __init__(self, languages):
+        self.languages = languages
+        self.variables = {}
+        self.cleared = 0
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+    def SetImage(self, image):
+        self.image = image
+
+    def GetUTF8Text(self):
+        return f"{self.languages}:{self.variables.get('tessedit_char_whitelist')}"
+
+    def Clear(self):
+        self.cleared += 1
+
+
+class StubPool(ocr.TesseractPool):
+    def __init__(self, size, fail=False):
+        super().__init__(size)
+        self.created = []
+        self.fail = fail
+
+    def _new_engine(self, languages):
+        if self.fail:
+            raise RuntimeError("no language data")
+        engine = StubEngine(languages)
+        self.created.append(engine)
+        return engine
+
+
+def test_pool_reuses_engines_and_resets_the_whitelist():
+    pool = StubPool(size=2)
+    assert pool.image_to_string(None, "eng", whitelist="0123456789") == "eng:0123456789"
+    assert pool.image_to_string(None, "eng") == "eng:"
+    assert len(pool.created) == 1
+    assert pool.created[0].cleared == 2
+    pool.image_to_string(None, "eng+ara")
+    assert [engine.languages for engine in pool.created] == ["eng", "eng+ara"]
+
+
+def test_pool_creates_at_most_size_engines_per_language():
+    pool = StubPool(size=2)
+    in_use = threading.Semaphore(0)
+    release = threading.Event()
+    engines = []
+
+    def hold():
+        with pool.engine("eng") as api:
+            engines.append(api)
+            in_use.release()
+            release.wait()
+
+    holders = [threading.Thread(target=hold) for _ in range(3)]
+    for thread in holders[:2]:
+        thread.start()
+    in_use.acquire(timeout=1)
+    in_use.acquire(timeout=1)
+    # both engines are in use, the third caller waits for one instead of creating another
+    holders[2].start()
+    assert not in_use.acquire(timeout=0.1)
+    assert len(pool.created) == 2
+    release.set()
+    for thread in holders:
+        thread.join(timeout=1)
+    assert len(engines) == 3
+    assert len(pool.created) == 2
+    assert engines[2] in engines[:2]
+
+
+def test_failed_engine_creation_frees_its_slot():
+    pool = StubPool(size=1, fail=True)
+    with pytest.raises(RuntimeError):
+        pool.image_to_string(None, "eng")
+    pool.fail = False
+    assert pool.image_to_string(None, "eng") == "eng:"
+    assert len(pool.created) == 1
+
+
+@pytest.fixture
+def osd(monkeypatch):
+    result = {"script": ("Latin", 5.0), "calls": 0}
+
+    class OsdPool:
+        def detect_script(self, image):
+            result["calls"] += 1
+            if isinstance(result["script"], Exception):
+                raise result["script"]
+            return result["script"]
+
+    monkeypatch.setattr(ocr, "get_tesseract_pool", OsdPool)
+    return result
+
+
+@pytest.mark.parametrize("script, languages, expected", [
+    (("Arabic", 5.0), ["eng", "ara"], "ara"),
+    (("Latin", 5.0), ["eng", "ara"], "eng"),
+    # uncertain detection
+    (("Latin", 0.2), ["eng", "ara"], "eng+ara"),
+    # no language data configured for the script
+    (("Cyrillic", 5.0), ["eng", "ara"], "eng+ara"),
+    (("Arabic", 5.0), ["eng", "fra"], "eng+fra"),
+    ((None, 0.0), ["eng", "ara"], "eng+ara"),
+])
+def test_detected_script_picks_the_languages(osd, script, languages, expected):
+    osd["script"] = script
+    image = Image.new("L", (50, 50), 255)
+    assert ocr.detect_languages(image, languages, backend="tesserocr") == expected
+
+
+def test_single_language_skips_script_detection(osd):
+    assert ocr.detect_languages(Image.new("L", (50, 50), 255), ["eng"], backend="tesserocr") == "eng"
+    assert osd["calls"] == 0
+
+
+def test_failed_script_detection_falls_back_to_all_languages(osd, caplog):
+    osd["script"] = RuntimeError("Too few characters")
+    with caplog.at_level(logging.WARNING, logger=ocr.__name__):
+        assert ocr.detect_languages(Image.new("L", (50, 50), 255), ["eng", "ara"], backend="tesserocr") == "eng+ara"
+    assert caplog.records[0].languages == "eng+ara"
+    assert ocr.ocr_metrics()["osd"]["count"] >= 1
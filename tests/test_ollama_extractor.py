@@ -0,0 +1,20 @@
+import pytest
+
+from ollama_extractor import clean_json_response
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('["dart", "flutter"]', ["dart", "flutter"]),
+    ('{"skills": ["go"]}', {"skills": ["go"]}),
+    ('Here you go: ["go", "rust",]', ["go", "rust"]),
+    ("{'skills': ['go']", {"skills": ["go"]}),
+])
+def test_returns_object_or_list(text, expected):
+    assert clean_json_response(text) == expected
+
+
+@pytest.mark.parametrize("text", ["42", '"skills"', "null", "true"])
+def test_scalar_json_is_not_returned_as_parsed(text):
+    # falls through to the error path, which hands back the text for the caller's isinstance checks
+    assert clean_json_response(text) == text
+
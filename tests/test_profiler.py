@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import profiler
+
+
+@pytest.mark.parametrize("query_string, headers, expected", [
+    (b"profile=1", [], True),
+    (b"a=2&profile=true", [], True),
+    (b"profile=10", [], False),
+    (b"noprofile=1", [], False),
+    (b"", [(b"x-profile", b"1")], True),
+    (b"", [], False),
+])
+def test_wants_profile(query_string, headers, expected):
+    assert profiler._wants_profile({"query_string": query_string, "headers": headers}) is expected
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    app = FastAPI()
+
+    @app.get("/test")
+    async def read_root():
+        return {"message": "i am alive"}
+
+    app.add_middleware(profiler.ProfilingMiddleware)
+    client = TestClient(app)
+    client.get("/test")
+    # the middleware stack is built on the first request
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, profiler.ProfilingMiddleware):
+        middleware = middleware.app
+    middleware.directory = tmp_path
+    return client, middleware
+
+
+def test_admin_requested_profile_names_the_file(profiled_app, monkeypatch, tmp_path):
+    client, _ = profiled_app
+
+    async def is_admin(scope):
+        return True
+
+    monkeypatch.setattr(profiler, "_is_admin", is_admin)
+    response = client.get("/test", headers={"X-Profile": "1"})
+    assert response.headers["x-profile-file"].startswith(str(tmp_path))
+    assert list(tmp_path.glob("*.folded"))
+
+
+def test_sampled_profile_does_not_expose_the_file(profiled_app, tmp_path):
+    client, middleware = profiled_app
+    middleware.sample_rate = 1.0
+    response = client.get("/test")
+    assert "x-profile-file" not in response.headers
+    assert list(tmp_path.glob("*-sampled.folded"))
+
+
+def test_non_admin_request_is_not_profiled(profiled_app, tmp_path):
+    client, _ = profiled_app
+    response = client.get("/test?profile=1")
+    assert "x-profile-file" not in response.headers
+    assert not list(tmp_path.glob("*.folded"))
+
+
+def test_profile_is_saved_off_the_event_loop(profiled_app, monkeypatch):
+    client, middleware = profiled_app
+    middleware.sample_rate = 1.0
+    loops = []
+    save = profiler.SamplingProfiler.save
+
+    def record_loop(self, path):
+        loops.append(asyncio._get_running_loop())
+        return save(self, path)
+
+    monkeypatch.setattr(profiler.SamplingProfiler, "save", record_loop)
+    client.get("/test")
+    assert loops == [None]
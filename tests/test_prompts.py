@@ -0,0 +1,24 @@
+from hrmcpserver.prompts import Prompt
+
+
+def test_short_resume_is_one_chunk():
+    assert Prompt.chunk_resume("Flutter developer\nDart", 100) == ["Flutter developer\nDart"]
+
+
+def test_chunks_keep_the_resume_order():
+    long_line = "x" * 100
+    resume = "\n".join(["first line", "second line", long_line, "last line"])
+
+    chunks = Prompt.chunk_resume(resume, max_tokens=10)
+
+    assert "".join(chunk.replace("\n", "") for chunk in chunks) == resume.replace("\n", "")
+    assert chunks[0] == "first line\nsecond line"
+
+
+def test_chunks_fit_the_token_budget():
+    resume = "\n".join(f"line {i} " + "word " * (i % 17) for i in range(200)) + "\n" + "y" * 333
+
+    chunks = Prompt.chunk_resume(resume, max_tokens=25)
+
+    assert all(Prompt.estimate_tokens(chunk) <= 25 for chunk in chunks)
+    assert "".join(chunk.replace("\n", "") for chunk in chunks) == resume.replace("\n", "")
@@ -0,0 +1,141 @@
+import time
+
+import pytest
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import index_routes
+import intent_router
+import response_cache as response_cache_module
+from core.env.env_utils import get_settings
+from hrmcpserver import hrserver
+from middleware import auth_middleware
+from response_cache import CALENDAR_TOOLS, SCREENING_TOOLS, ResponseCache
+
+
+class FakeExtractor:
+    """
+    Embeds a question as a bag of its first letters, so rephrasings with the same words are near-identical.
+    """
+
+    def __init__(self):
+        self.timeouts = []
+        self.stalled = False
+
+    def embed(self, texts, model, timeout=None):
+        self.timeouts.append(timeout)
+        if self.stalled:
+            raise requests.Timeout("stalled")
+        return [[float(sum(1 for word in text.split() if word[0] == letter)) for letter in "abcdefghijklmnopqrstuvwxyz"] for text in texts]
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(extractor=FakeExtractor())
+
+
+def test_exact_hit_and_miss(cache):
+    cache.put("alice", "Free time for bob@example.com?", "Mon 9-10", {"get_interviewer_free_time"})
+    assert cache.get("alice", "free time for bob@example.com") == "Mon 9-10"
+    assert cache.get("alice", "free time for carol@example.com") is None
+    # answers are per user
+    assert cache.get("dave", "free time for bob@example.com") is None
+    assert cache.metrics()["hits"] == 1
+
+
+def test_semantic_hit_needs_the_same_entities(cache):
+    cache.put("alice", "screen cv.pdf for flutter developer", "80%", {"candidate_screening"})
+    assert cache.get("alice", "for flutter developer screen cv.pdf") == "80%"
+    assert cache.get("alice", "screen other.pdf for flutter developer") is None
+
+
+def test_embedding_timeout_is_a_miss(cache):
+    cache.put("alice", "screen cv.pdf for flutter developer", "80%", {"candidate_screening"})
+    cache.extractor.stalled = True
+    assert cache.get("alice", "for flutter developer screen cv.pdf") is None
+    assert set(cache.extractor.timeouts) == {get_settings().EMBEDDING_TIMEOUT}
+
+
+def test_entries_expire_by_tool_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    cache.put("alice", "free time for bob@example.com", "Mon 9-10", CALENDAR_TOOLS)
+    cache.put("alice", "screen cv.pdf for flutter developer", "80%", SCREENING_TOOLS)
+
+    now[0] += get_settings().RESPONSE_CACHE_CALENDAR_TTL + 1
+    assert cache.get("alice", "free time for bob@example.com") is None
+    assert cache.get("alice", "screen cv.pdf for flutter developer") == "80%"
+
+    now[0] += get_settings().RESPONSE_CACHE_TTL
+    assert cache.get("alice", "screen cv.pdf for flutter developer") is None
+
+
+def test_invalidation_by_tool(cache):
+    cache.put("alice", "free time for bob@example.com", "Mon 9-10", CALENDAR_TOOLS)
+    cache.put("alice", "screen cv.pdf for flutter developer", "80%", SCREENING_TOOLS)
+    cache.invalidate(SCREENING_TOOLS)
+    assert cache.get("alice", "screen cv.pdf for flutter developer") is None
+    assert cache.get("alice", "free time for bob@example.com") == "Mon 9-10"
+
+
+def test_side_effect_answers_are_not_cached(cache):
+    cache.put("alice", "interview bob@example.com monday 10", "Booked", {"schedule_interview"})
+    assert cache.get("alice", "interview bob@example.com monday 10") is None
+
+
+@pytest.fixture
+def chat(cache, monkeypatch):
+    monkeypatch.setattr(index_routes, "response_cache", cache)
+    monkeypatch.setattr(get_settings(), "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(intent_router, "route", lambda message: None)
+    app = FastAPI()
+    app.include_router(index_routes.router)
+    app.dependency_overrides[auth_middleware] = lambda: {"sub": "alice"}
+    client = TestClient(app)
+
+    def send(message, answer, tool_calls):
+        def process_chat_message(message, calls, rounds):
+            calls.extend(tool_calls)
+            return answer
+        monkeypatch.setattr(index_routes, "process_chat_message", process_chat_message)
+        return client.post("/chat", data={"message": message}).json()
+
+    return send
+
+
+def test_chat_caches_successful_tool_answers(chat):
+    free_time = (hrserver.get_interviewer_free_time, {"interviewer": "bob@example.com"}, {"available_slots": []})
+    assert chat("free time for bob@example.com", "No slots", [free_time])["metrics"]["cached"] is False
+    assert chat("free time for bob@example.com", "ignored", [])["result"] == "No slots"
+
+
+def test_chat_does_not_cache_tool_errors_or_clarifications(chat):
+    failed = (hrserver.get_interviewer_free_time, {"interviewer": "bob@example.com"}, {"error": "calendar unavailable"})
+    chat("free time for bob@example.com", "Error executing tool", [failed])
+    chat("what can you do?", "Which role do you mean?", [])
+    assert chat("free time for bob@example.com", "No slots", [])["metrics"]["cached"] is False
+    assert chat("what can you do?", "Answer", [])["metrics"]["cached"] is False
+
+
+def test_chat_screening_invalidates_earlier_screening_answers(chat, cache):
+    cache.put("alice", "how did cv.pdf do", "80%", SCREENING_TOOLS)
+    screening = (hrserver.candidate_screening, {"resume": "doc_0123456789", "role": "flutter developer"}, {"error": "unknown handle"})
+    chat("screen cv.pdf for flutter developer", "Error", [screening])
+    assert cache.get("alice", "how did cv.pdf do") is None
+
+
+def test_upload_invalidates_screening_answers(cache, monkeypatch, tmp_path):
+    monkeypatch.setattr(index_routes, "response_cache", cache)
+    monkeypatch.setattr(index_routes, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(hrserver, "extract_text_from_bytes", lambda data, file_name: "resume text")
+    monkeypatch.setattr(hrserver, "register_document", lambda text, file_name: {"handle": "doc_0123456789"})
+    app = FastAPI()
+    app.include_router(index_routes.router)
+    app.dependency_overrides[auth_middleware] = lambda: {"sub": "alice"}
+    cache.put("alice", "screen cv.pdf for flutter developer", "80%", SCREENING_TOOLS)
+
+    response = TestClient(app).post("/upload", files={"file": ("cv.pdf", b"%PDF")}, data={"role": "flutter developer"})
+
+    assert response.status_code == 200
+    assert cache.get("alice", "screen cv.pdf for flutter developer") is None
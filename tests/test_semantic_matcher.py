@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from hrmcpserver import semantic_matcher
+
+HR_SKILLS = [{"role": "devops engineer", "skills": {"technical_skills": ["kubernetes", "terraform"]}}]
+
+
+class FakeExtractor:
+    """
+    Embeds every text as a one-hot vector of its first letter; `on_embed` runs inside each call.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.timeouts = []
+        self.on_embed = None
+
+    def embed(self, texts, model, timeout=None):
+        self.calls.append(list(texts))
+        self.timeouts.append(timeout)
+        if self.on_embed:
+            self.on_embed()
+        return [[1.0 if ord(text[0]) % 26 == column else 0.0 for column in range(26)] for text in texts]
+
+
+@pytest.fixture
+def matcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_matcher, "CACHE_DIR", tmp_path)
+    skills_path = tmp_path / "hrskills.json"
+    skills_path.write_text(json.dumps(HR_SKILLS))
+    return semantic_matcher.SemanticMatcher(HR_SKILLS, skills_path, "fake-embed", extractor=FakeExtractor(), memo_size=2, timeout=3.0)
+
+
+def test_resume_skills_are_memoized(matcher):
+    matcher.similarities(["kubernetes"], ["k8s", "terraform"])
+    matcher.similarities(["kubernetes"], ["k8s", "terraform"])
+    # the first call builds the role skill matrix, the second embeds the resume skills once
+    assert matcher.extractor.calls[1:] == [["k8s", "terraform"]]
+
+
+def test_memo_eviction_during_an_embed_call(matcher):
+    matcher.similarities(["kubernetes"], ["k8s"])
+    # another thread evicting every entry while this one waits for the model
+    matcher.extractor.on_embed = matcher._memo.clear
+    scores = matcher.similarities(["kubernetes"], ["k8s", "kubectl"])
+    assert scores["kubernetes"] == pytest.approx(1.0)
+
+
+def test_every_embed_call_has_the_timeout(matcher):
+    matcher.similarities(["kubernetes"], ["k8s"])
+    assert matcher.extractor.timeouts == [3.0, 3.0]
+
+
+def test_skill_matrix_is_loaded_from_the_cache(matcher, tmp_path):
+    extractor = FakeExtractor()
+    cached = semantic_matcher.SemanticMatcher(HR_SKILLS, tmp_path / "hrskills.json", "fake-embed", extractor=extractor)
+    assert extractor.calls == []
+    assert (cached._skill_matrix == matcher._skill_matrix).all()
+
+
+def test_matrix_timeout_falls_back_to_lexical_matching(tmp_path, monkeypatch):
+    import requests
+
+    from core.env.env_utils import get_settings
+    from hrmcpserver import hrserver
+
+    class StalledExtractor(FakeExtractor):
+        def embed(self, texts, model, timeout=None):
+            raise requests.Timeout(f"no answer within {timeout}s")
+
+    monkeypatch.setattr(semantic_matcher, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(semantic_matcher, "_matcher_cache", {})
+    monkeypatch.setattr(semantic_matcher, "OllamaExtractor", StalledExtractor)
+    monkeypatch.setattr(get_settings(), "SEMANTIC_MATCHING", True)
+    monkeypatch.setattr(get_settings(), "DUPLICATE_DETECTION", False)
+    monkeypatch.setattr(get_settings(), "SKILL_LLM_MODE", "off")
+
+    role = hrserver.load_hr_skills()[0]["role"]
+    result = hrserver.candidate_screening("Experienced with Kubernetes, Docker, Git and Python", role)
+    assert "summary" in result
@@ -0,0 +1,45 @@
+from hrmcpserver import skill_matcher
+from hrmcpserver.skill_matcher import SkillMatcher, matched_skills, normalize_skill, skill_terms
+
+
+def _find(terms, text):
+    return SkillMatcher(terms).find_terms(text)
+
+
+def test_skill_terms_split_and_drop_stopwords():
+    assert skill_terms("HTML5, CSS3 and SCSS") == ["html5", "css3", "scss"]
+    assert skill_terms("Unit testing with Jasmine") == ["unit testing jasmine"]
+
+
+def test_aliases():
+    assert _find(["kubernetes", "react", "go"], "Deployed ReactJS apps on k8s, services in golang") == {"kubernetes", "react", "go"}
+
+
+def test_multi_word_terms_match_as_a_phrase():
+    terms = ["dependency injection"]
+    assert _find(terms, "Used dependency injection everywhere") == {"dependency injection"}
+    assert _find(terms, "injection of dependency") == set()
+
+
+def test_stopwords_in_the_resume_are_skipped_like_in_the_terms():
+    terms = skill_terms("Unit testing with Jasmine")
+    assert _find(terms, "Unit testing with Jasmine and Karma") == {"unit testing jasmine"}
+    assert _find(terms, "unit testing using jasmine") == {"unit testing jasmine"}
+
+
+def test_overlapping_terms():
+    terms = ["unit testing", "unit testing jasmine", "testing", "go"]
+    assert _find(terms, "unit testing jasmine") == {"unit testing", "unit testing jasmine", "testing"}
+    # whole tokens only
+    assert _find(terms, "google cloud") == set()
+
+
+def test_matched_skills_for_a_role():
+    role_skills = {"technical_skills": ["Kubernetes", "Unit testing with Jasmine", "Rust"]}
+    found = _find({term for skill in role_skills["technical_skills"] for term in skill_terms(skill)}, "k8s, unit testing with jasmine")
+    assert matched_skills(role_skills, found) == ["Kubernetes", "Unit testing with Jasmine"]
+
+
+def test_normalized_search_skills_match_the_stored_terms():
+    assert normalize_skill("Unit testing with Jasmine") == skill_terms("Unit testing with Jasmine")[0]
+    assert normalize_skill("  K8s ") == "kubernetes"
@@ -0,0 +1,115 @@
+import gzip
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from core import static_files
+from core.static_files import CompressedStaticFiles, build_static
+
+STYLE = "body { margin: 0; }\n" * 40
+SCRIPT = "console.log('ready');\n" * 40
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / "static"
+    source.mkdir()
+    (source / "index.html").write_text('<link href="style.css"><script src="./script.js"></script>' + "<p>resume screening</p>" * 20)
+    (source / "style.css").write_text(STYLE)
+    (source / "script.js").write_text(SCRIPT)
+    (source / "tiny.txt").write_text("small")
+    return source
+
+
+@pytest.fixture
+def client(source_dir, tmp_path):
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items(count: int = 1):
+        return {"items": ["candidate"] * count}
+
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.mount("/", CompressedStaticFiles(str(source_dir), build_dir=tmp_path / "build"))
+    return TestClient(app)
+
+
+def _hashed_names(index_html):
+    return re.findall(r'(?:href|src)="([^"]+)"', index_html)
+
+
+def test_index_references_hashed_assets(client):
+    response = client.get("/", headers={"accept-encoding": "identity"})
+    assert response.headers["cache-control"] == static_files.REVALIDATE
+    style, script = _hashed_names(response.text)
+    assert re.fullmatch(r"style\.[0-9a-f]{10}\.css", style)
+    assert re.fullmatch(r"script\.[0-9a-f]{10}\.js", script)
+
+    asset = client.get(f"/{style}", headers={"accept-encoding": "identity"})
+    assert asset.text == STYLE
+    assert asset.headers["cache-control"] == static_files.IMMUTABLE
+
+
+def test_unchanged_file_is_not_modified(client):
+    etag = client.get("/style.css").headers["etag"]
+    response = client.get("/style.css", headers={"if-none-match": etag})
+    assert response.status_code == 304
+
+
+def test_precompressed_variant_is_not_compressed_again(client):
+    response = client.get("/style.css", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # the client decodes the body once
+    assert response.text == STYLE
+
+
+def test_refused_encoding_gets_the_original(client):
+    response = client.get("/style.css", headers={"accept-encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+    assert response.text == STYLE
+
+
+def test_small_files_are_not_precompressed(client, tmp_path):
+    assert not (tmp_path / "build" / "tiny.txt.gz").exists()
+    response = client.get("/tiny.txt", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_gzip_middleware_skips_small_responses(client):
+    small = client.get("/api/items", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    large = client.get("/api/items", params={"count": 200}, headers={"accept-encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert len(large.json()["items"]) == 200
+
+
+def test_build_writes_atomically_and_keeps_other_workers_temp_files(source_dir, tmp_path):
+    build_dir = tmp_path / "build"
+    build_dir.mkdir()
+    in_progress = build_dir / ".style.css.12345.tmp"
+    in_progress.write_bytes(b"partial")
+    (build_dir / "stale.css").write_text("old")
+
+    build_static(source_dir, build_dir)
+    assert in_progress.exists()
+    assert not (build_dir / "stale.css").exists()
+    assert not [path for path in build_dir.rglob("*.tmp") if path != in_progress]
+    assert gzip.decompress((build_dir / "style.css.gz").read_bytes()).decode() == STYLE
+
+
+def test_failed_write_leaves_the_served_file_intact(tmp_path, monkeypatch):
+    target = tmp_path / "style.css"
+    target.write_text("served")
+
+    def interrupted(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(static_files.os, "replace", interrupted)
+    with pytest.raises(OSError):
+        static_files._write(target, b"new build")
+    assert target.read_text() == "served"
+    assert [path.name for path in tmp_path.iterdir()] == ["style.css"]
@@ -0,0 +1,82 @@
+import asyncio
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import timing
+from core.log_utils import RequestIdMiddleware, request_id_var
+from middleware import TimingMiddleware
+
+
+def _work_in_thread():
+    with timing.timed("ocr"):
+        pass
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        with timing.timed("db"):
+            await asyncio.sleep(0.01)
+        with timing.timed("db"):
+            pass
+        await asyncio.to_thread(_work_in_thread)
+        return {"request_id": request_id_var.get()}
+
+    @app.get("/sync")
+    def sync_work():
+        # sync endpoints run in the thread pool with a copy of the request context
+        with timing.timed("llm"):
+            pass
+        return {"request_id": request_id_var.get()}
+
+    app.add_middleware(TimingMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+    return TestClient(app)
+
+
+def _metrics(header):
+    return {
+        match.group(1): (float(match.group(2)), match.group(3))
+        for match in re.finditer(r'([\w.]+);dur=([\d.]+)(?:;desc="([^"]+)")?', header)
+    }
+
+
+def test_server_timing_lists_the_stages(client):
+    response = client.get("/work")
+    metrics = _metrics(response.headers["server-timing"])
+    assert set(metrics) == {"db", "ocr", "total"}
+    assert metrics["db"][0] >= 10
+    assert metrics["db"][1] == "2 calls"
+    assert metrics["ocr"][1] is None
+    assert metrics["total"][0] >= metrics["db"][0]
+    assert float(response.headers["x-process-time"]) * 1000 == pytest.approx(metrics["total"][0], abs=0.1)
+
+
+def test_sync_endpoints_are_timed(client):
+    assert set(_metrics(client.get("/sync").headers["server-timing"])) == {"llm", "total"}
+
+
+def test_timed_outside_a_request_is_a_no_op():
+    with timing.timed("db"):
+        pass
+    assert timing.server_timing() == ""
+
+
+def test_request_id_is_propagated(client):
+    response = client.get("/work", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123"
+    assert response.json() == {"request_id": "abc-123"}
+    assert request_id_var.get() is None
+
+
+def test_request_id_is_generated_and_bounded(client):
+    generated = client.get("/sync")
+    assert re.fullmatch(r"[0-9a-f]{32}", generated.headers["x-request-id"])
+    assert generated.json()["request_id"] == generated.headers["x-request-id"]
+    assert client.get("/sync", headers={"X-Request-ID": "x" * 100}).headers["x-request-id"] == "x" * 64